@@ -23,22 +23,29 @@
 from .util.report import (Report, print_reports, print_report,
                           options_overide, reports_summary)
 from .util.fragment import Fragment
+from .util.profiler import Profiler
 from .rst_parser.core import RSTParser
+from .rst_parser.cache import ParseCache
+from .rst_parser.corpus import Corpus
 from .rst_parser import environment as env
 from .rst_parser import hunk_post_parser
+from .rst_parser import walker as rst_walker
 from . import autofix
 from .util import file_opener
 
 
-def init_tools():
-    """Execute the init function of each module."""
+def init_tools(loop_only=False, cache=None):
+    """Execute the init function of each module.
+    cache -- parse cache used by the corpus pass.
+    """
     mods = []
     for module_name, value in config.tool_selection.items():
         if module := import_module(module_name):
-            ops = init(module.OPS, value["tools"], module_name)
+            ops = init(module.OPS, value["tools"], module_name, loop_only, cache)
             if ops is not None and len(ops) != 0:
                 mods.append((ops, value["ext"]))
 
+    Corpus().run(cache)
     return mods
 
 
@@ -60,8 +67,11 @@ def import_module(name, dst=None):
     print("module import: can't find the {0} module".format(name))
 
 
-def init(ops, op_names, mod_name):
-    """Execute the pre functions of the tools."""
+def init(ops, op_names, mod_name, loop_only=False, cache=None):
+    """Execute the pre functions of the tools.
+    loop_only -- skip the tools which are not applied per document.
+    cache -- parse cache used by the corpus pass of the lexicon setup.
+    """
     ops_sel = []
     if isinstance(op_names, str):
         op_names = [op_names]
@@ -69,16 +79,20 @@ def init(ops, op_names, mod_name):
     for op_name in op_names:
         if op_name in {"collocation", "hyphen", "new-word"}:
             if init.lexicon_exist is None:
-                init.lexicon_exist = import_module("update_lexicon").setup_lexicon()
+                init.lexicon_exist = import_module("update_lexicon").setup_lexicon(cache)
             if init.lexicon_exist is False:
                 continue
 
         for toolname, tool, tool_pre, do_loop in ops:
             if op_name == toolname:
+                if loop_only and do_loop is False:
+                    break
                 args = {}
                 if tool_pre is not None:
                     # evaluate pre
+                    time_start = Profiler().clock()
                     args = tool_pre(toolname)
+                    Profiler().add("init", tool_key(tool, toolname), time_start)
 
                 ops_sel.append((toolname, tool, args, do_loop))
                 break
@@ -90,6 +104,11 @@ def init(ops, op_names, mod_name):
 init.lexicon_exist = None
 
 
+def tool_key(tool, toolname):
+    """Return the module and tool name used in the profile."""
+    return tool.__module__.rpartition('.')[-1] + '.' + toolname
+
+
 def get_hunks_version(path, parse_options, version_options):
     """Gets text snippets (hunk) from versioning."""
     filter_options = {"tools": {"blank-line", "flavor", "indention", "heading-level",
@@ -98,7 +117,7 @@ def get_hunks_version(path, parse_options, version_options):
     for source, changes in vsn_inter.run_diff(path=path, **version_options):
         if not changes:
             continue
-        code = source.union(changes)
+        code = source.union(changes, True)
         filter_options["changes"] = changes.correlate_len(other=source)
         config_dynamic = {"_at_eof": not code.content[-1].endswith('\n')}
         yield code, parse_options, filter_options, config_dynamic
@@ -143,50 +162,60 @@ def split_span(path):
         yield code, parse_options, None, config_dynamic
 
 
-def apply(mods, path, rst_parser, parse_options, version_options=None):
-    """Parse the hunks and apply the tools."""
-    def filter_reports(report, options):
-        """Filter out reports in the diff context."""
-        return bool(report.tool in options["tools"] and
-                    report.output.start_lincol is not None and options["changes"] is not None and
-                    not options["changes"].is_in_span(report.output.start_lincol))
-
+def apply(mods, path, rst_parser, parse_options, version_options=None,
+          jobs=1, selection=None):
+    """Parse the hunks and apply the tools.
+    jobs -- number of worker processes the documents are distributed to.
+    selection -- module name, tool names and extension of a single module selection.
+    """
     reports = []
     mods_loop = []
     for ops, ext_test in mods:
         ops_loop = []
         for op in ops:
             toolname, tool, args, do_loop = op
-            if not do_loop:
+            if do_loop is False:
+                time_start = Profiler().clock()
+                reports_len = len(reports)
                 reports = tool(toolname, reports, **args)
+                Profiler().add("tool", tool_key(tool, toolname), time_start,
+                               reports=len(reports) - reports_len)
             else:
                 ops_loop.append(op)
 
         mods_loop.append((ops_loop, ext_test))
 
-    if not mods_loop:
-        print_reports(reports)
-        return reports
-
     mods = mods_loop
     del mods_loop
 
-    if not path:
-        path = monostyle_io.path_to_abs("")
     print_options = options_overide()
     show_current = bool(version_options)
     filename_prev = None
-    if parse_options["resolve"]:
-        titles, targets = env.get_link_titles(rst_parser)
-        parse_options["titles"] = titles
-        parse_options["targets"] = targets
+    if not any(ops for ops, _ in mods):
+        # only tools which are not applied per document
+        filename_prev = print_reports(reports, print_options, is_final=False)
+        show_current = False
+        results = ()
+    else:
+        if not path:
+            path = monostyle_io.path_to_abs("")
+        if parse_options["resolve"] and jobs == 1 and "titles" not in parse_options.keys():
+            titles, targets = env.get_link_titles(rst_parser)
+            parse_options["titles"] = titles
+            parse_options["targets"] = targets
+
+        hunks = ((get_hunks_version if version_options else get_hunks_file)
+                 (path, parse_options, version_options))
+        if jobs == 1:
+            results = ((hunk[0], apply_hunk(mods, rst_parser, *hunk)) for hunk in hunks)
+        else:
+            results = apply_parallel(hunks, jobs, selection, parse_options, rst_parser)
 
     reports_file = []
-    for code, parse_options, filter_options, config_dynamic in \
-                (get_hunks_version if version_options else get_hunks_file) \
-                (path, parse_options, version_options):
+    do_sort = bool(print_options["sort_key"])
+    for code, reports_hunk in results:
         if filename_prev != code.filename:
-            if print_options["sort_key"]:
+            if do_sort:
                 filename_prev = print_reports(reports_file, print_options,
                                               filename_prev, is_final=False)
             reports.extend(reports_file)
@@ -198,23 +227,62 @@ def filter_reports(report, options):
                                             code.start_lincol[0], code.end_lincol[0]),
                                     is_temp=True)
 
-        document = rst_parser.document(code=code)
-        if parse_options["parse"] and document.code.filename.endswith(".rst"):
-            document = rst_parser.parse(document)
-            if parse_options["post"]:
-                document = hunk_post_parser.parse(rst_parser, document)
-            if (parse_options["resolve"] and
-                    "titles" in parse_options.keys() and "targets" in parse_options.keys()):
-                document = env.resolve_link_title(document, parse_options["titles"],
-                                                  parse_options["targets"])
-                document = env.resolve_subst(document, rst_parser.substitution)
-
-        do_sort = bool(print_options["sort_key"])
+        for report in reports_hunk:
+            if not do_sort:
+                filename_prev = print_report(report, print_options, filename_prev)
+            reports_file.append(report)
+
+    reports.extend(reports_file)
+    if do_sort:
+        filename_prev = print_reports(reports_file, print_options, filename_prev, is_final=False)
+
+    if print_options["show_summary"]:
+        reports_summary(reports, print_options)
+
+    if show_current:
+        monostyle_io.print_over("processing: done")
+
+    if rst_parser.warnings:
+        print('\n'.join(rst_parser.warnings))
+    return reports
+
+
+def apply_hunk(mods, rst_parser, code, parse_options, filter_options, config_dynamic):
+    """Parse a single hunk and apply the looping tools."""
+    def filter_reports(report, options):
+        """Filter out reports in the diff context."""
+        return bool(report.tool in options["tools"] and
+                    report.output.start_lincol is not None and options["changes"] is not None and
+                    not options["changes"].is_in_span(report.output.start_lincol))
+
+    profiler = Profiler()
+    size = len(code) if profiler.is_active else 0
+    document = rst_parser.document(code=code)
+    if parse_options["parse"] and document.code.filename.endswith(".rst"):
+        time_start = profiler.clock()
+        document = rst_parser.parse(document)
+        profiler.add("parse", "", time_start, size)
+        if parse_options["post"]:
+            time_start = profiler.clock()
+            document = hunk_post_parser.parse(rst_parser, document)
+            profiler.add("post-parse", "", time_start, size)
+        if (parse_options["resolve"] and
+                "titles" in parse_options.keys() and "targets" in parse_options.keys()):
+            time_start = profiler.clock()
+            document = env.resolve_link_title(document, parse_options["titles"],
+                                              parse_options["targets"])
+            document = env.resolve_subst(document, rst_parser.substitution)
+            profiler.add("resolve", "", time_start, size)
+
+    reports = []
+    # the tools share the node index of the final tree
+    rst_walker.index_document(document)
+    try:
         for ops, ext_test in mods:
             if ext_test and not document.code.filename.endswith(ext_test):
                 continue
 
-            for toolname, tool, args, do_loop in ops:
+            for toolname, tool, args, _ in ops:
                 # init failed
                 if args is None:
                     continue
@@ -222,28 +290,107 @@ def filter_reports(report, options):
                 if "config" in args:
                     args["config"].update(config_dynamic)
 
+                time_start = profiler.clock()
                 reports_tool = []
                 reports_tool = tool(toolname, document, reports_tool, **args)
+                profiler.add("tool", tool_key(tool, toolname), time_start, size, len(reports_tool))
 
                 for report in reports_tool:
                     if not filter_options or not filter_reports(report, filter_options):
-                        if not do_sort:
-                            filename_prev = print_report(report, print_options, filename_prev)
-                        reports_file.append(report)
+                        reports.append(report)
+    finally:
+        rst_walker.unindex_document(document)
 
-    reports.extend(reports_file)
-    if print_options["sort_key"]:
-        filename_prev = print_reports(reports_file, print_options, filename_prev, is_final=False)
+    return reports
 
-    if print_options["show_summary"]:
-        reports_summary(reports, print_options)
 
-    if show_current:
-        monostyle_io.print_over("processing: done")
+def apply_parallel(hunks, jobs, selection, parse_options, rst_parser):
+    """Distribute the hunks to a pool of worker processes.
+    Yields the results in the order of the hunks.
+    """
+    import multiprocessing
+
+    profiler = Profiler()
+    initargs = (monostyle_io.norm_path_sep(os.getcwd()), config.export(), selection,
+                bool(parse_options["resolve"]), bool(rst_parser.cache), profiler.is_active)
+    with multiprocessing.Pool(jobs, init_worker, initargs) as pool:
+        for code, reports_hunk, warnings, records in pool.imap(apply_worker, hunks):
+            rst_parser.warnings.extend(warnings)
+            profiler.merge(records)
+            yield code, reports_hunk
+
+
+def init_worker(root, config_state, selection, do_resolve, use_cache, do_profile=False):
+    """Setup a worker process with its own tools and parser."""
+    os.chdir(root)
+    config.load(config_state)
+    Report.override_templates(config.template_override)
+    if do_profile:
+        Profiler().start()
+
+    rst_parser = RSTParser(ParseCache() if use_cache else None)
+    resolved = {}
+    if do_resolve:
+        resolved["titles"], resolved["targets"] = env.collect_link_titles()
+
+    if selection is None:
+        mods = init_tools(True, rst_parser.cache)
+    else:
+        module_name, op_names, ext = selection
+        mods = ((init(import_module(module_name).OPS, op_names, module_name, True,
+                      rst_parser.cache), ext),)
+        Corpus().run(rst_parser.cache)
+
+    init_worker.state = (mods, rst_parser, resolved)
+
+init_worker.state = None
+
+
+def apply_worker(hunk):
+    """Apply the tools on a hunk within a worker process."""
+    mods, rst_parser, resolved = init_worker.state
+    code, parse_options, filter_options, config_dynamic = hunk
+    parse_options.update(resolved)
+    reports = apply_hunk(mods, rst_parser, code, parse_options, filter_options, config_dynamic)
+    warnings = rst_parser.warnings
+    rst_parser.warnings = []
+    return code, reports, warnings, Profiler().pop_records()
 
-    if rst_parser.warnings:
-        print('\n'.join(rst_parser.warnings))
-    return reports
+
+def watch(mods, path, rst_parser, parse_options, interval):
+    """Apply the looping tools on the files within the path when they change.
+    interval -- seconds between the polls of the files.
+    """
+    import time
+
+    mods = [([op for op in ops if op[3] is not False], ext_test) for ops, ext_test in mods]
+    path = monostyle_io.path_to_abs(monostyle_io.split_path_appendix(path)[0]
+                                    if path else "", "doc")
+
+    def scan():
+        stats = {}
+        for filename in (monostyle_io.doc_files(path) if os.path.isdir(path) else (path,)):
+            try:
+                stat = os.stat(filename)
+            except (IOError, OSError):
+                continue
+            stats[filename] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    print("watching:", monostyle_io.path_to_rel(path) or path)
+    stats = scan()
+    try:
+        while True:
+            time.sleep(interval)
+            stats_new = scan()
+            for filename, stat in stats_new.items():
+                if stats.get(filename) != stat:
+                    rst_parser.warnings = []
+                    apply(mods, filename, rst_parser, parse_options.copy())
+            stats = stats_new
+
+    except KeyboardInterrupt:
+        print("stopped watching")
 
 
 def update(path=None, rev=None):
@@ -346,6 +493,12 @@ def main_mod(mod_doc, ops, mod_file, do_parse=True):
 def main(descr=None, mod_selection=None, parse_options=None):
     import argparse
 
+    if mod_selection is None and len(sys.argv) > 1 and sys.argv[1] in {"serve", "client"}:
+        from . import serve
+        if sys.argv[1] == "serve":
+            return serve.main_serve(sys.argv[2:])
+        return serve.main_client(sys.argv[2:])
+
     if descr is None:
         descr = "Applies various tools on the differential of the documentation."
     is_selection = bool(mod_selection is not None)
@@ -393,7 +546,22 @@ def main(descr=None, mod_selection=None, parse_options=None):
     parser.add_argument("-s", "--resolve",
                         action="store_true", dest="do_resolve", default=False,
                         help="resolve link titles and substitutions")
-
+    parser.add_argument("-j", "--jobs",
+                        dest="jobs", nargs='?', type=int, const=os.cpu_count(), default=1,
+                        metavar="N",
+                        help="process the documents with N worker processes")
+    parser.add_argument("--watch",
+                        dest="watch", nargs='?', type=float, const=0.25, metavar="SEC",
+                        help="check the files again when they change (polled every SEC seconds)")
+    parser.add_argument("--no-cache",
+                        action="store_true", dest="no_cache", default=False,
+                        help="parse all documents instead of loading unchanged ones from the cache")
+    parser.add_argument("--rebuild-cache",
+                        action="store_true", dest="rebuild_cache", default=False,
+                        help="empty the parse cache before the run")
+    parser.add_argument("--profile",
+                        dest="profile", nargs='?', const="", metavar="JSONFILE",
+                        help="print the time taken by each stage and tool (and write it to JSONFILE)")
 
     if not is_selection:
         parser.add_argument("-u", "--update",
@@ -415,15 +583,29 @@ def main(descr=None, mod_selection=None, parse_options=None):
 
     if not args.auto and "console_options" in vars(config).keys():
         config.console_options["show_autofix"] = False
-
-    if mod_selection is None:
-        mods = init_tools()
-    else:
-        mods = ((init(mod_selection[0], args.op_names, mod_selection[2]), mod_selection[1]),)
-    rst_parser = RSTParser()
+    if args.profile is not None:
+        Profiler().start()
+
+    parse_cache = None
+    if not args.no_cache:
+        parse_cache = ParseCache()
+        if args.rebuild_cache:
+            parse_cache.clear()
+    rst_parser = RSTParser(parse_cache)
     if not parse_options:
         parse_options = {"parse": True, "resolve": False, "post": False}
     parse_options["resolve"] = args.do_resolve
+    jobs = max(args.jobs or 1, 1)
+    if parse_options["resolve"] and jobs == 1:
+        # collected within the corpus pass of the tools
+        parse_options["titles"], parse_options["targets"] = env.collect_link_titles()
+
+    if mod_selection is None:
+        mods = init_tools(cache=parse_cache)
+    else:
+        mods = ((init(mod_selection[0], args.op_names, mod_selection[2], cache=parse_cache),
+                 mod_selection[1]),)
+        Corpus().run(parse_cache)
     version_options = None
     path = None
     if args.filename is None and (mod_selection is None or args.patch is not None):
@@ -453,7 +635,20 @@ def main(descr=None, mod_selection=None, parse_options=None):
         print("error: directory is not a repository")
         return 2
 
-    reports = apply(mods, path, rst_parser, parse_options, version_options)
+    selection = None
+    if mod_selection is not None:
+        selection = (mod_selection[2], args.op_names, mod_selection[1])
+    if args.watch is not None and version_options:
+        print("error: watch requires the file mode")
+        return 2
+
+    reports = apply(mods, path, rst_parser, parse_options, version_options, jobs, selection)
+    if args.watch is not None:
+        watch(mods, path, rst_parser, parse_options, max(args.watch, 0.05))
+    if args.profile is not None:
+        Profiler().print_table()
+        if args.profile:
+            Profiler().write(args.profile)
     if args.patch is not None:
         for report in reports:# custom root
             report.output.filename = monostyle_io.path_to_abs(report.output.filename, "cwd")
@@ -0,0 +1,8 @@
+
+"""
+bench
+~~~~~
+
+Benchmarks and differential checks of the parser, the utilities and the tools
+on a generated corpus.
+"""
@@ -0,0 +1,351 @@
+
+"""
+bench.main
+~~~~~~~~~~
+
+Run the benchmarks on a generated corpus and store the results as JSON.
+"""
+
+import sys
+import os
+import time
+import json
+import platform
+import tempfile
+
+import monostyle
+import monostyle.config as config
+from monostyle.bench.generator import generate
+
+
+TOOL_MODULES = ("markup", "markup2", "listsearch", "spelling", "capitalization",
+                "punctuation", "char", "natural", "code_style")
+
+
+def measure(func, repeat):
+    """Return the min and mean wall time of the function calls."""
+    times = []
+    for _ in range(repeat):
+        time_start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - time_start)
+    return {"min": min(times), "mean": sum(times) / len(times), "repeat": repeat}
+
+
+def setup_project(root, file_count, blocks, seed):
+    """Create a project with the generated corpus."""
+    doc_dir = os.path.join(root, "manual")
+    os.makedirs(os.path.join(root, "monostyle"), exist_ok=True)
+    filenames, size = generate(doc_dir, file_count, blocks, seed)
+    os.chdir(root)
+    config.init(root, "", True)
+    return filenames, size
+
+
+def bench_parser(codes):
+    from monostyle.rst_parser.core import RSTParser
+    from monostyle.rst_parser.cache import serialize, deserialize
+    import monostyle.rst_parser.walker as rst_walker
+
+    rst_parser = RSTParser()
+
+    def parse():
+        for code in codes:
+            rst_parser.parse(rst_parser.document(code=code.copy()))
+        rst_parser.warnings = []
+
+    yield "rst_parser.parse", parse
+
+    documents = [rst_parser.parse(rst_parser.document(code=code.copy())) for code in codes]
+    rst_parser.warnings = []
+
+    def iter_node():
+        for document in documents:
+            for _ in rst_walker.iter_node(document.body, "role"):
+                pass
+
+    yield "rst_parser.iter_node", iter_node
+
+    trees = [serialize(document) for document in documents]
+
+    def store():
+        for document in documents:
+            serialize(document)
+
+    def load():
+        for tree, code in zip(trees, codes):
+            deserialize(tree, code)
+
+    def iter_index():
+        for tree in trees:
+            for _ in tree.iter_index("role"):
+                pass
+
+    yield "rst_parser.cache.serialize", store
+    yield "rst_parser.cache.deserialize", load
+    yield "rst_parser.compact.iter_index", iter_index
+
+
+def bench_segmenter(codes):
+    from monostyle.util.segmenter import Segmenter
+
+    segmenter = Segmenter()
+    paragraphs = [para for code in codes for para, _ in segmenter.iter_paragraph(code)]
+    sentences = [sent for para in paragraphs for sent, _ in segmenter.iter_sentence(para)]
+
+    def loop(iterator, sources, **kwargs):
+        def func():
+            for source in sources:
+                for _ in iterator(source, **kwargs):
+                    pass
+        return func
+
+    yield "segmenter.iter_paragraph", loop(segmenter.iter_paragraph, codes)
+    yield "segmenter.iter_sentence", loop(segmenter.iter_sentence, paragraphs)
+    yield "segmenter.iter_clause", loop(segmenter.iter_clause, sentences)
+    yield "segmenter.iter_parenthesis", loop(segmenter.iter_parenthesis, paragraphs)
+    yield "segmenter.iter_word", loop(segmenter.iter_word, paragraphs)
+    yield "segmenter.iter_word.lazy", loop(segmenter.iter_word, paragraphs, lazy=True)
+    yield "segmenter.iter_wordsub", loop(segmenter.iter_wordsub, paragraphs)
+    yield "segmenter.iter_number", loop(segmenter.iter_number, paragraphs)
+
+    def segment():
+        for code in codes:
+            segmentation = segmenter.segment(code)
+            for index in range(len(segmentation.sentences)):
+                for _ in segmentation.iter_word(index):
+                    pass
+
+    def nested():
+        for code in codes:
+            for para, _ in segmenter.iter_paragraph(code):
+                for sent, _ in segmenter.iter_sentence(para):
+                    for _ in segmenter.iter_word(sent):
+                        pass
+
+    yield "segmenter.segment", segment
+    yield "segmenter.nested", nested
+
+
+def bench_fragment(codes):
+    spans = []
+    for code in codes:
+        length = code.span_len(True)
+        step = max(length // 200, 1)
+        spans.append((code, [(start, min(start + 80, length))
+                             for start in range(0, length, step)]))
+    spans_lincol = [(code, [(code.pos_to_lincol(start), code.pos_to_lincol(end))
+                            for start, end in code_spans])
+                    for code, code_spans in spans]
+
+    def slice_spans(spans):
+        def func():
+            for code, code_spans in spans:
+                for start, end in code_spans:
+                    code.slice(start, end)
+        return func
+
+    yield "fragment.slice_pos", slice_spans(spans)
+    yield "fragment.slice_lincol", slice_spans(spans_lincol)
+
+
+def bench_tools(codes):
+    import monostyle.__main__ as main_mod
+    from monostyle.rst_parser.core import RSTParser
+    from monostyle.rst_parser.corpus import Corpus
+    import monostyle.rst_parser.walker as rst_walker
+    import monostyle.update_lexicon as update_lexicon
+
+    update_lexicon.lexicon_write_csv(update_lexicon.build_lexicon())
+    main_mod.init.lexicon_exist = True
+
+    ops_all = []
+    for module_name in TOOL_MODULES:
+        module = main_mod.import_module(module_name)
+        ops = main_mod.init(module.OPS, [op[0] for op in module.OPS], module_name)
+        ops_all.extend((module_name, op) for op in ops)
+    Corpus().run()
+
+    rst_parser = RSTParser()
+    documents = [rst_parser.parse(rst_parser.document(code=code.copy())) for code in codes]
+    for document in documents:
+        rst_walker.index_document(document)
+
+    def apply_loop(toolname, tool, args):
+        def func():
+            for document in documents:
+                if "config" in args:
+                    args["config"]["_at_eof"] = True
+                tool(toolname, document, [], **args)
+        return func
+
+    def apply_global(toolname, tool, args):
+        def func():
+            tool(toolname, [], **args)
+        return func
+
+    for module_name, (toolname, tool, args, do_loop) in ops_all:
+        if args is None:
+            continue
+        yield ("tool." + module_name + "." + toolname,
+               (apply_global if do_loop is False else apply_loop)(toolname, tool, args))
+
+
+def bench_diff(codes):
+    import difflib
+    from monostyle.git_inter import difference
+
+    lines_diff = []
+    for index, code in enumerate(codes):
+        lines = str(code).splitlines(keepends=True)
+        lines_changed = [line[:-1] + " new\n" if index_line % 9 == 0 and line.strip() else line
+                         for index_line, line in enumerate(lines)]
+        filename = os.path.relpath(code.filename)
+        lines_diff.append("diff --git a/{0} b/{0}\n".format(filename))
+        lines_diff.extend(difflib.unified_diff(lines, lines_changed,
+                                               "a/" + filename, "b/" + filename))
+
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".diff",
+                                     delete=False) as patch_file:
+        patch_file.write(''.join(lines_diff))
+        filename_patch = patch_file.name
+
+    def diff():
+        for _ in difference(False, filename_patch):
+            pass
+
+    try:
+        yield "git_inter.difference", diff
+    finally:
+        os.remove(filename_patch)
+
+
+def bench_editor(codes):
+    from monostyle.util.editor import Editor
+    from monostyle.util.segmenter import Segmenter
+
+    segmenter = Segmenter()
+    changes = []
+    for code in codes:
+        words = list(segmenter.iter_word(code))
+        changes.append((code, [word.copy().replace(str(word).upper())
+                               for word in words[::20]]))
+
+    def apply():
+        for code, code_changes in changes:
+            editor = Editor(code)
+            for change in code_changes:
+                editor.add(change)
+            editor.apply(virtual=True)
+
+    yield "editor.apply", apply
+
+
+SUITES = (bench_parser, bench_segmenter, bench_fragment, bench_tools, bench_diff, bench_editor)
+
+
+def run(codes, repeat, selection=None):
+    """Run the benchmarks whose name contains one of the selection strings."""
+    results = {}
+    for suite in SUITES:
+        for name, func in suite(codes):
+            if selection and not any(sel in name for sel in selection):
+                continue
+            print("{0}: ...".format(name), end="\r", flush=True)
+            results[name] = measure(func, repeat)
+            print("{0}: {1:.4f} s".format(name, results[name]["min"]))
+
+    return results
+
+
+def compare(results, filename):
+    """Print the ratio of the min times to the stored results."""
+    try:
+        with open(filename, "r", encoding="utf-8") as results_file:
+            results_prev = json.load(results_file)["results"]
+    except (IOError, OSError, ValueError, KeyError) as err:
+        print("{0}: cannot read results: {1}".format(filename, err))
+        return
+
+    print()
+    width = max(map(len, results.keys()), default=0)
+    for name, result in results.items():
+        if name not in results_prev.keys():
+            continue
+        time_prev = results_prev[name]["min"]
+        ratio = result["min"] / time_prev if time_prev else 0
+        print("{0:<{1}}  {2:9.4f}  {3:9.4f}  {4:6.2f}x".format(
+              name, width, time_prev, result["min"], ratio))
+
+
+def main():
+    import argparse
+    from monostyle.util.fragment import Fragment
+
+    descr = "Run the benchmarks on a generated corpus."
+    parser = argparse.ArgumentParser(prog="monostyle.bench", description=descr)
+    parser.add_argument("-n", "--files",
+                        dest="file_count", type=int, default=20,
+                        help="number of generated documents")
+    parser.add_argument("-b", "--blocks",
+                        dest="blocks", type=int, default=60,
+                        help="number of blocks (paragraphs, lists, tables etc.) per document")
+    parser.add_argument("--seed",
+                        dest="seed", type=int, default=0,
+                        help="seed of the generator")
+    parser.add_argument("-r", "--repeat",
+                        dest="repeat", type=int, default=3,
+                        help="number of runs of each benchmark (the min time is compared)")
+    parser.add_argument("-k", "--select",
+                        dest="selection", action="append", metavar="NAME",
+                        help="only run the benchmarks whose name contains NAME")
+    parser.add_argument("-o", "--output",
+                        dest="output", metavar="JSONFILE",
+                        help="write the results to JSONFILE")
+    parser.add_argument("-c", "--compare",
+                        dest="compare", metavar="JSONFILE",
+                        help="compare the results to the ones in JSONFILE")
+
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    if args.compare:
+        args.compare = os.path.abspath(args.compare)
+
+    with tempfile.TemporaryDirectory(prefix="monostyle_bench_") as root:
+        filenames, size = setup_project(root, args.file_count, args.blocks, args.seed)
+        codes = []
+        for filename in filenames:
+            with open(filename, "r", encoding="utf-8") as doc_file:
+                codes.append(Fragment(filename.replace('\\', '/'), doc_file.read()))
+
+        print("corpus: {0} files, {1} chars".format(len(codes), size))
+        results = run(codes, max(args.repeat, 1), args.selection)
+        os.chdir(cwd)
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.output:
+        data = {
+            "version": monostyle.__version__,
+            "python": platform.python_version(),
+            "options": {"files": args.file_count, "blocks": args.blocks,
+                        "seed": args.seed, "repeat": args.repeat},
+            "size": size,
+            "results": results
+        }
+        try:
+            with open(args.output, "w", encoding="utf-8") as results_file:
+                json.dump(data, results_file, indent=4)
+        except (IOError, OSError) as err:
+            print("{0}: cannot write results: {1}".format(args.output, err))
+            return 2
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+
+"""
+bench.differential
+~~~~~~~~~~~~~~~~~~
+
+Differential check of the inline parsing with and without the prefilter
+of the inline types on the generated corpus.
+"""
+
+import sys
+import random
+
+from monostyle.bench.generator import Generator
+from monostyle.rst_parser.core import RSTParser
+from monostyle.rst_parser.rst_node import print_node
+
+
+class RSTParserUnfiltered(RSTParser):
+    """Parser which searches each inline type in every text node."""
+
+    def _is_inline_candidate(self, name, code_str):
+        return True
+
+
+def shuffle_words(text, rnd):
+    """Shuffle the words of each line after the first word
+    to recombine the inline markup while keeping the block structure.
+    """
+    lines = []
+    for line in text.split("\n"):
+        indent = line[:len(line) - len(line.lstrip(" "))]
+        words = line[len(indent):].split(" ")
+        if len(words) > 2:
+            rest = words[1:]
+            rnd.shuffle(rest)
+            words = words[:1] + rest
+        lines.append(indent + " ".join(words))
+    return "\n".join(lines)
+
+
+def parse_result(rst_parser, filename, text):
+    """Return the dumped tree, the warnings and the error of the parse."""
+    rst_parser.warnings = []
+    try:
+        document = rst_parser.parse(rst_parser.document(filename, text))
+    except Exception as err:
+        return None, rst_parser.warnings, "{0}: {1}".format(type(err).__name__, err)
+
+    return (print_node(document.body, show_loc=True, show_pos=True),
+            rst_parser.warnings, None)
+
+
+def compare(texts):
+    """Parse the texts with both parsers.
+    Returns the filenames of the texts with differing results.
+    """
+    rst_parser = RSTParser()
+    rst_parser_ref = RSTParserUnfiltered()
+    mismatches = []
+    for filename, text in texts:
+        if parse_result(rst_parser, filename, text) != parse_result(rst_parser_ref,
+                                                                    filename, text):
+            mismatches.append(filename)
+
+    return mismatches
+
+
+def generate_texts(file_count, blocks, seed):
+    """Return the generated documents and their shuffled variants."""
+    generator = Generator(seed, file_count)
+    rnd = random.Random(seed)
+    texts = []
+    for file_index in range(file_count):
+        filename = "bench/file_{0:03d}.rst".format(file_index)
+        text = generator.document(file_index, blocks)
+        texts.append((filename, text))
+        texts.append((filename + ":shuffled", shuffle_words(text, rnd)))
+    return texts
+
+
+def main():
+    import argparse
+
+    descr = "Compare the inline parsing with and without the prefilter of the inline types."
+    parser = argparse.ArgumentParser(prog="monostyle.bench.differential", description=descr)
+    parser.add_argument("-n", "--files",
+                        dest="file_count", type=int, default=20,
+                        help="number of generated documents")
+    parser.add_argument("-b", "--blocks",
+                        dest="blocks", type=int, default=60,
+                        help="number of blocks (paragraphs, lists, tables etc.) per document")
+    parser.add_argument("--seed",
+                        dest="seed", type=int, default=0,
+                        help="seed of the generator and the shuffles")
+
+    args = parser.parse_args()
+
+    texts = generate_texts(args.file_count, args.blocks, args.seed)
+    mismatches = compare(texts)
+    for filename in mismatches:
+        print("{0}: differs".format(filename))
+
+    print("{0} of {1} documents differ".format(len(mismatches), len(texts)))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+
+"""
+bench.generator
+~~~~~~~~~~~~~~~
+
+Deterministic generator of RST documents.
+"""
+
+import os
+import random
+
+
+WORDS = (
+    "the", "the", "the", "a", "a", "an", "of", "of", "to", "to", "and", "and", "in", "in",
+    "is", "is", "it", "for", "with", "on", "as", "by", "this", "that", "can", "be", "are",
+    "from", "or", "at", "which", "when", "not", "all", "each", "will", "only", "also",
+    "object", "objects", "mesh", "vertex", "vertices", "edge", "edges", "face", "faces",
+    "material", "texture", "node", "nodes", "render", "camera", "light", "scene", "view",
+    "editor", "panel", "menu", "button", "property", "properties", "value", "values",
+    "mode", "tool", "tools", "option", "options", "selection", "selected", "active",
+    "modifier", "curve", "surface", "bone", "armature", "animation", "frame", "keyframe",
+    "color", "image", "file", "data", "layer", "channel", "axis", "origin", "cursor",
+    "set", "sets", "use", "used", "uses", "add", "adds", "remove", "change", "changes",
+    "move", "rotate", "scale", "select", "display", "show", "hide", "create", "apply",
+    "define", "defines", "control", "controls", "affect", "affects", "enable", "disable",
+    "new", "current", "default", "different", "same", "other", "first", "last", "main",
+    "simple", "smooth", "sharp", "global", "local", "linear", "constant", "visible",
+    "more", "less", "very", "then", "however", "usually", "instead", "directly",
+)
+
+ROLES = (
+    ("kbd", ("Ctrl-A", "Shift-D", "Alt-G", "Tab", "LMB", "Ctrl-Z", "NumpadPeriod")),
+    ("menuselection", ("Add --> Mesh --> Cube", "Object --> Apply --> Scale",
+                       "Edit --> Preferences", "View --> Frame Selected")),
+    ("abbr", ("UV (texture coordinates)", "RGB (Red, Green, Blue)",
+              "HDRI (High Dynamic Range Image)")),
+    ("term", ("Normal", "Pivot Point", "Keyframe")),
+)
+
+LANGUAGES = ("python", "none", "bash")
+
+ADMONITIONS = ("note", "tip", "warning", "important", "hint", "seealso")
+
+
+class Generator:
+    """Creates RST documents from a seeded random source.
+
+    The same seed and options give the same text.
+    """
+
+    def __init__(self, seed=0, file_count=1):
+        self.random = random.Random(seed)
+        self.file_count = file_count
+        self.targets = []
+        self.substdefs = []
+
+
+    def words(self, count):
+        return [self.random.choice(WORDS) for _ in range(count)]
+
+
+    def sentence(self, markup=True):
+        words = self.words(self.random.randint(5, 18))
+        if markup:
+            for index in self.random.sample(range(len(words)), self.random.randint(0, 2)):
+                words[index] = self.inline(words[index])
+        words[0] = words[0][0].upper() + words[0][1:]
+        if self.random.random() < 0.2:
+            words.insert(self.random.randint(1, len(words) - 1), '(' + ' '.join(self.words(3)) + ')')
+        if self.random.random() < 0.3:
+            index = self.random.randint(2, len(words) - 1)
+            words[index - 1] += ','
+        return ' '.join(words) + self.random.choice(('.', '.', '.', '.', '?', '!', ':'))
+
+
+    def inline(self, word):
+        choice = self.random.random()
+        if choice < 0.15:
+            return '*' + word + '*'
+        if choice < 0.25:
+            return "**" + word + "**"
+        if choice < 0.4:
+            return "``" + word + "``"
+        if choice < 0.65:
+            name, contents = self.random.choice(ROLES)
+            return ":{0}:`{1}`".format(name, self.random.choice(contents))
+        if choice < 0.75:
+            return ":doc:`/bench/file_{0:03d}`".format(self.random.randrange(self.file_count))
+        if choice < 0.85 and self.targets:
+            return ":ref:`{0}`".format(self.random.choice(self.targets))
+        if choice < 0.92 and self.substdefs:
+            return '|' + self.random.choice(self.substdefs) + '|'
+        return "`{0} <https://example.org/{1}>`__".format(word, word)
+
+
+    def paragraph(self, indent=0, sentences=None, width=100):
+        if sentences is None:
+            sentences = self.random.randint(1, 8)
+        text = ' '.join(self.sentence() for _ in range(sentences))
+        return self.wrap(text, indent, width)
+
+
+    def wrap(self, text, indent=0, width=100):
+        lines = []
+        line = []
+        line_len = indent
+        for word in text.split(' '):
+            if line and line_len + len(word) > width:
+                lines.append(' ' * indent + ' '.join(line))
+                line = []
+                line_len = indent
+            line.append(word)
+            line_len += len(word) + 1
+        if line:
+            lines.append(' ' * indent + ' '.join(line))
+        return '\n'.join(lines)
+
+
+    def title(self, char, overline=False):
+        words = self.words(self.random.randint(1, 4))
+        text = ' '.join(word[0].upper() + word[1:] for word in words)
+        line = char * len(text)
+        if overline:
+            return '\n'.join((line, text, line))
+        return '\n'.join((text, line))
+
+
+    def target(self, file_index):
+        id_str = "bench-{0:03d}-{1}".format(file_index, len(self.targets))
+        self.targets.append(id_str)
+        return ".. _" + id_str + ":"
+
+
+    def substdef(self):
+        name = "subst {0}".format(len(self.substdefs))
+        self.substdefs.append(name)
+        return ".. |{0}| replace:: {1}".format(name, ' '.join(self.words(3)))
+
+
+    def bullet_list(self, indent=0, depth=0):
+        lines = []
+        for _ in range(self.random.randint(2, 6)):
+            lines.append(' ' * indent + "- " + self.paragraph(indent + 2, self.random.randint(1, 2))
+                         .lstrip(' '))
+            if depth < 2 and self.random.random() < 0.3:
+                lines.append('')
+                lines.append(self.bullet_list(indent + 2, depth + 1))
+                lines.append('')
+        return '\n'.join(lines)
+
+
+    def enum_list(self, indent=0, depth=0):
+        lines = []
+        for _ in range(self.random.randint(2, 5)):
+            lines.append(' ' * indent + "#. " + self.paragraph(indent + 3, 1).lstrip(' '))
+            if depth < 2 and self.random.random() < 0.25:
+                lines.append('')
+                lines.append(self.enum_list(indent + 3, depth + 1))
+                lines.append('')
+        return '\n'.join(lines)
+
+
+    def definition_list(self):
+        entries = []
+        for _ in range(self.random.randint(2, 5)):
+            term = ' '.join(word[0].upper() + word[1:] for word in self.words(2))
+            entries.append(term + '\n' + self.paragraph(3, self.random.randint(1, 3)))
+        return '\n\n'.join(entries)
+
+
+    def field_list(self):
+        lines = []
+        for _ in range(self.random.randint(2, 4)):
+            lines.append(':{0}: {1}'.format(' '.join(self.words(2)).title(), ' '.join(self.words(4))))
+        return '\n'.join(lines)
+
+
+    def admonition(self):
+        return ".. {0}::\n\n{1}".format(self.random.choice(ADMONITIONS),
+                                        self.paragraph(3, self.random.randint(1, 4)))
+
+
+    def figure(self):
+        return (".. figure:: /images/bench_{0}.png\n   :align: center\n\n{1}"
+                .format(self.random.randrange(100), self.paragraph(3, 1)))
+
+
+    def code_block(self):
+        lines = ["bpy.ops.{0}.{1}()".format(*self.words(2)) for _ in range(self.random.randint(2, 8))]
+        return ".. code-block:: {0}\n\n{1}".format(self.random.choice(LANGUAGES),
+                                                   '\n'.join("   " + line for line in lines))
+
+
+    def grid_table(self):
+        columns = self.random.randint(2, 4)
+        widths = [self.random.randint(8, 20) for _ in range(columns)]
+
+        def border(char):
+            return '+' + '+'.join(char * (width + 2) for width in widths) + '+'
+
+        def row():
+            cells = []
+            for width in widths:
+                text = ' '.join(self.words(3))[:width]
+                cells.append(' ' + text.ljust(width) + ' ')
+            return '|' + '|'.join(cells) + '|'
+
+        lines = [border('-'), row(), border('=')]
+        for _ in range(self.random.randint(2, 6)):
+            lines.append(row())
+            lines.append(border('-'))
+        return '\n'.join(lines)
+
+
+    def simple_table(self):
+        columns = self.random.randint(2, 4)
+        widths = [self.random.randint(6, 16) for _ in range(columns)]
+        border = '  '.join('=' * width for width in widths)
+
+        def row():
+            return '  '.join(' '.join(self.words(2))[:width].ljust(width)
+                             for width in widths).rstrip()
+
+        lines = [border, row(), border]
+        lines.extend(row() for _ in range(self.random.randint(2, 6)))
+        lines.append(border)
+        return '\n'.join(lines)
+
+
+    def block(self):
+        """Return a random block."""
+        kinds = (
+            (self.paragraph, 40),
+            (lambda: self.paragraph(0, self.random.randint(10, 20)), 6),
+            (self.bullet_list, 10),
+            (self.enum_list, 6),
+            (self.definition_list, 6),
+            (self.field_list, 3),
+            (self.admonition, 7),
+            (self.figure, 5),
+            (self.code_block, 5),
+            (self.grid_table, 4),
+            (self.simple_table, 4),
+        )
+        choice = self.random.randrange(sum(weight for _, weight in kinds))
+        for func, weight in kinds:
+            if choice < weight:
+                return func()
+            choice -= weight
+
+
+    def document(self, file_index, blocks):
+        """Return the text of a document with the count of blocks."""
+        self.targets = []
+        self.substdefs = []
+        parts = [self.title('*', True), self.paragraph()]
+        level = 0
+        for index in range(blocks):
+            if index != 0 and index % 6 == 0:
+                level = self.random.randint(0, min(level + 1, 2))
+                if self.random.random() < 0.5:
+                    parts.append(self.target(file_index))
+                parts.append(self.title("=-^"[level]))
+            if self.random.random() < 0.05:
+                parts.append(self.substdef())
+            parts.append(self.block())
+
+        return '\n\n'.join(parts) + '\n'
+
+
+def generate(directory, file_count=20, blocks=60, seed=0):
+    """Write the documents to the directory.
+    Returns the filenames and the total count of chars.
+    """
+    generator = Generator(seed, file_count)
+    directory = os.path.join(directory, "bench")
+    os.makedirs(directory, exist_ok=True)
+    filenames = []
+    size = 0
+    for file_index in range(file_count):
+        text = generator.document(file_index, blocks)
+        filename = os.path.join(directory, "file_{0:03d}.rst".format(file_index))
+        with open(filename, "w", encoding="utf-8") as doc_file:
+            doc_file.write(text)
+        filenames.append(filename)
+        size += len(text)
+
+    return filenames, size
@@ -10,12 +10,13 @@
 
 import monostyle.util.monostyle_io as monostyle_io
 from monostyle.util.report import Report
-from monostyle.rst_parser.core import RSTParser
+from monostyle.rst_parser.corpus import Corpus
 import monostyle.rst_parser.walker as rst_walker
 
 from monostyle.util.char_catalog import CharCatalog
 from monostyle.util.part_of_speech import PartofSpeech
 from monostyle.util.segmenter import Segmenter
+from monostyle.util.token_table import get_token_table
 from monostyle.util.lexicon import Lexicon
 
 
@@ -62,20 +63,19 @@ def abbr_caps_pre(_):
 
 def abbr_caps(toolname, document, reports, re_lib):
     """Check if uppercase letters of an abbreviation match those of the explanation."""
-    for node in rst_walker.iter_node(document.body, "role"):
-        if rst_walker.is_of(node, "*", "abbr"):
-            if not node.id:
-                reports.append(
-                    Report('F', toolname, node.code, "abbreviation without an explanation"))
-                continue
+    for node in rst_walker.iter_node_named(document.body, "role", "abbr"):
+        if not node.id:
+            reports.append(
+                Report('F', toolname, node.code, "abbreviation without an explanation"))
+            continue
 
-            uppers_head = re.sub(re_lib["noupper"], "", str(node.head))
-            uppers_id = re.sub(re_lib["noupper"], "", str(node.id))
-            if uppers_head != uppers_id:
-                reports.append(
-                    Report('W', toolname, node.code,
-                           "abbreviation uppercase mismatch: {0} - {1}"
-                           .format(uppers_head, uppers_id)))
+        uppers_head = re.sub(re_lib["noupper"], "", str(node.head))
+        uppers_id = re.sub(re_lib["noupper"], "", str(node.id))
+        if uppers_head != uppers_id:
+            reports.append(
+                Report('W', toolname, node.code,
+                       "abbreviation uppercase mismatch: {0} - {1}"
+                       .format(uppers_head, uppers_id)))
 
     return reports
 
@@ -85,24 +85,24 @@ def admonition_title(toolname, document, reports):
     segmenter = Segmenter()
     threshold = 0.2
 
-    for node in rst_walker.iter_node(document.body, "dir"):
-        if rst_walker.is_of(node, "*", ('admonition', 'hint', 'important',
-                                        'note', 'tip', 'warning')):
-            if node.head and node.body:
-                word_all = 0
-                word_low = 0
+    for node in rst_walker.iter_node_named(document.body, "dir",
+                                           ('admonition', 'hint', 'important',
+                                            'note', 'tip', 'warning')):
+        if node.head and node.body:
+            word_all = 0
+            word_low = 0
 
-                for word in segmenter.iter_word(node.head.code):
-                    word_str = str(word)
-                    if len(word_str) >= 4:
-                        word_all += 1
-                        if word_str[0].islower():
-                            word_low += 1
-                if word_all > 1 and word_low/ word_all >= threshold:
-                    reports.append(
-                        Report('W', toolname, node.head.code.copy().clear(True),
-                               "admonition caption titlecase: {:4.0%}"
-                               .format(word_low/ word_all), node.head.code))
+            for word in segmenter.iter_word(node.head.code):
+                word_str = str(word)
+                if len(word_str) >= 4:
+                    word_all += 1
+                    if word_str[0].islower():
+                        word_low += 1
+            if word_all > 1 and word_low/ word_all >= threshold:
+                reports.append(
+                    Report('W', toolname, node.head.code.copy().clear(True),
+                           "admonition caption titlecase: {:4.0%}"
+                           .format(word_low/ word_all), node.head.code))
 
     return reports
 
@@ -127,7 +127,7 @@ def heading_caps_pre(_):
 
 def heading_caps(toolname, document, reports, re_lib):
     """Check the heading title capitalization."""
-    segmenter = Segmenter()
+    memo = rst_walker.get_memo(document.body)
     part_of_speech = PartofSpeech()
     instr_pos = {
         "*": {"*": ["head", "body"]}
@@ -147,7 +147,7 @@ def heading_caps(toolname, document, reports, re_lib):
                 is_first_word = False
 
             buf = None
-            for word in segmenter.iter_word(part.code):
+            for word in get_token_table(memo, part.code).words():
                 if buf:
                     if message_repl := titlecase(part_of_speech, buf, is_first_word,
                                                  False, "heading"):
@@ -178,7 +178,7 @@ def heading_caps(toolname, document, reports, re_lib):
 
 def pos_case(toolname, document, reports):
     """Find Capitalized non-nouns (i.a.) which can be a typo or missing punctuation."""
-    segmenter = Segmenter()
+    memo = rst_walker.get_memo(document.body)
     part_of_speech = PartofSpeech()
 
     instr_pos = {
@@ -209,9 +209,10 @@ def pos_case(toolname, document, reports):
                     not rst_walker.is_of(node_par.parent_node, "document")):
                 continue
 
-        for sen, stop in segmenter.iter_sentence(part.code):
+        tokens = get_token_table(memo, part.code)
+        for index, (sen, stop) in enumerate(tokens.sentences()):
             is_first_word = not was_open
-            for word in segmenter.iter_word(sen):
+            for word in tokens.sentence_words(index):
                 if is_first_word:
                     is_first_word = False
                     continue
@@ -259,44 +260,53 @@ def proper_noun_pre(_):
     }
 
     lexicon = Lexicon()
-    rst_parser = RSTParser()
-    for filename, text in monostyle_io.doc_texts():
-        document = rst_parser.parse(rst_parser.document(filename, text))
 
+    def visit(document):
+        words = dict()
         first = True
         for part in rst_walker.iter_nodeparts_instr(document.body, instr_pos, instr_neg):
-            for sen, _ in segmenter.iter_sentence(part.code):
-                for word in segmenter.iter_word(sen):
+            for sen, _ in segmenter.iter_sentence(part.code, lazy=True):
+                for word in segmenter.iter_word(sen, lazy=True):
                     if first:
                         first = False
                         continue
 
                     word_str = str(word)
-                    entry = lexicon.add(word_str)
-                    if "up" not in entry.keys():
-                        entry.update((("up", 0), ("low", 0)))
-                    entry["up" if word_str[0].isupper() else "low"] += 1
+                    if word_str not in words.keys():
+                        words[word_str] = 0
+                    words[word_str] += 1
 
                 first = True
             first = True
 
-    removals = set()
-    for word, entry in lexicon:
-        if entry["up"] == 0:
-            removals.add(word)
-            continue
+        return words
 
-        ratio = entry["up"] / (entry["up"] + entry["low"])
-        if ratio < threshold:
-            removals.add(word)
-            continue
+    def finish(contributions):
+        for words in contributions.values():
+            for word_str, count in words.items():
+                entry = lexicon.add(word_str, count=count)
+                if "up" not in entry.keys():
+                    entry.update((("up", 0), ("low", 0)))
+                entry["up" if word_str[0].isupper() else "low"] += count
+
+        removals = set()
+        for word, entry in lexicon:
+            if entry["up"] == 0:
+                removals.add(word)
+                continue
 
-        entry["ratio"] = ratio
-        del entry["up"], entry["low"]
+            ratio = entry["up"] / (entry["up"] + entry["low"])
+            if ratio < threshold:
+                removals.add(word)
+                continue
+
+            entry["ratio"] = ratio
+            del entry["up"], entry["low"]
 
-    for word in removals:
-        lexicon.remove(word)
+        for word in removals:
+            lexicon.remove(word)
 
+    Corpus().register("proper-noun", visit, finish)
     args = dict()
     args["config"] = {"instr_pos": instr_pos, "instr_neg": instr_neg}
     args["data"] = lexicon
@@ -306,11 +316,11 @@ def proper_noun_pre(_):
 
 def proper_noun(toolname, document, reports, data, config):
     """Find in minority lowercase words."""
-    segmenter = Segmenter()
+    memo = rst_walker.get_memo(document.body)
 
     for part in rst_walker.iter_nodeparts_instr(document.body, config["instr_pos"],
                                                 config["instr_neg"]):
-        for word in segmenter.iter_word(part.code):
+        for word in get_token_table(memo, part.code).words():
             word_str = str(word)
             if not word_str[0].islower():
                 continue
@@ -401,7 +411,6 @@ def typ_case_pre(_):
     """Find lowercase types."""
     global listsearch
     import monostyle.listsearch as listsearch
-    rst_parser = RSTParser()
 
     def typ_titles(document, b_type, terms):
         """Get page title and create versions where one word is not uppercase."""
@@ -459,31 +468,56 @@ def typ_titles(document, b_type, terms):
         ("Node", "modeling/geometry_nodes/", ["group"]),
         ("Strip", "video_editing/sequencer/strips/", [])
     )
-    terms = []
-    for kind, path, ignore in typs:
-        ignore.extend(("index", "introduction"))
 
-        for filename, text in monostyle_io.doc_texts(monostyle_io.path_to_abs(path, "doc")):
-            skip = False
+    def visitor(kind, path, ignore):
+        def visit(document):
+            filename = document.code.filename
             for skip_filename in ignore:
                 if filename.endswith(skip_filename + ".rst"):
-                    skip = True
-                    break
+                    return []
 
             # is not nested
             filename_rel = monostyle_io.path_to_rel(filename, "doc")
             for _, path_rec, __ in typs:
                 if (path != path_rec and len(path) < len(path_rec) and
                         filename_rel.startswith(path_rec)):
-                    skip = True
-                    break
-            if not skip:
-                document = rst_parser.parse(rst_parser.document(filename, text))
-                terms = typ_titles(document, kind, terms)
+                    return []
+
+            return typ_titles(document, kind, [])
+
+        return visit
+
+    def finisher(index):
+        def finish(contributions):
+            terms_typs[index] = contributions.values()
+            if index != len(typs) - 1:
+                return
+
+            terms = []
+            for terms_typ in terms_typs:
+                for terms_file in terms_typ:
+                    for term, head in terms_file:
+                        for _, head_rec in terms:
+                            if head_rec == head:
+                                break
+                        else:
+                            terms.append([term, head])
+
+            args["data"] = listsearch.compile_terms(terms,
+                                                    {"flags": listsearch.parse_flags("")})
+
+        return finish
 
     args = dict()
     args["config"] = {}
-    args["data"] = listsearch.compile_terms(terms, {"flags": listsearch.parse_flags("")})
+    args["data"] = None
+    # collected per type to keep the order
+    terms_typs = [None] * len(typs)
+    for index, (kind, path, ignore) in enumerate(typs):
+        ignore.extend(("index", "introduction"))
+        Corpus().register("type:" + path, visitor(kind, path, ignore), finisher(index),
+                          monostyle_io.path_to_abs(path, "doc"))
+
     return args
 
 
@@ -31,18 +31,18 @@ def char_search(toolname, document, reports):
     for pattern, message, repl in chars:
         char_re = re.compile(r"[" + pattern + r"]")
         explicits += pattern
-        for char_m in re.finditer(char_re, text):
-            output = document.code.slice_match(char_m, 0)
+        for output in document.code.slice_matches(char_m.span() for char_m in
+                                                  re.finditer(char_re, text)):
             reports.append(
                 Report('E', toolname, output, message,
                        fix=output.copy().replace_over(repl) if repl else None))
 
     char_re = re.compile(r"[^\n -~À-ʨ©®°±€™\t" + explicits + r"]")
-    for char_m in re.finditer(char_re, text):
+    for output in document.code.slice_matches(char_m.span() for char_m in
+                                              re.finditer(char_re, text)):
         reports.append(
-            Report('E', toolname,
-                   document.code.slice_match(char_m, 0),
-                   "uncommon char: {0}, 0x{0:04x}".format(ord(char_m.group(0)))))
+            Report('E', toolname, output,
+                   "uncommon char: {0}, 0x{0:04x}".format(ord(str(output)))))
 
     return reports
 
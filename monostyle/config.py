@@ -12,6 +12,7 @@
 tool_selection = None
 project_dirs = None
 console_options = None
+cache_options = None
 config_override = None
 template_override = None
 
@@ -42,6 +43,19 @@ def init(root, cwd, use_default):
     return True
 
 
+def export():
+    """Return the loaded configuration to pass it to another process."""
+    return {key: globals()[key] for key in ("tool_selection", "project_dirs", "console_options",
+                                            "cache_options", "config_override",
+                                            "template_override")}
+
+
+def load(state):
+    """Set the configuration from an exported one."""
+    for key, value in state.items():
+        globals()[key] = value
+
+
 def read_file(root, from_default):
     """Load default/user config file."""
     def remove_comments(text):
@@ -12,6 +12,8 @@
 from monostyle.util.report import Report
 from monostyle.util.fragment import Fragment
 from monostyle.rst_parser.core import RSTParser
+from monostyle.rst_parser.corpus import Corpus
+from monostyle.rst_parser.rst_node import NodeRST
 import monostyle.rst_parser.walker as rst_walker
 
 
@@ -101,16 +103,31 @@ def unused_image_pre(_):
     rst_parser = RSTParser()
     commented_out = True
 
-    for filename, text in monostyle_io.doc_texts():
-        document = rst_parser.parse(rst_parser.document(filename, text))
-        if commented_out:
-            for node in rst_walker.iter_node(document.body, "comment"):
-                node.body = rst_parser.parse_block(node.body)
-        for node in rst_walker.iter_node(document.body, "dir"):
-            if rst_walker.is_of(node, "*", {"figure", "image"}):
-                images.add(monostyle_io.path_to_rel(monostyle_io.path_to_abs(
-                           str(node.head.code).strip(), "doc"), "img"))
-
+    def parse_comment(node):
+        """Parse the body of a detached copy to leave the shared document unaltered."""
+        comment = NodeRST("comment", node.code)
+        comment.append_part("body", node.body.code)
+        rst_parser.document(code=node.code).body.append_child(comment, False)
+        return rst_parser.parse_block(comment.body)
+
+    def visit_part(root, images_file):
+        for node in rst_walker.iter_node(root, {"dir", "comment"}):
+            if node.node_name == "comment":
+                if commented_out and node.body:
+                    visit_part(parse_comment(node), images_file)
+            elif rst_walker.is_of(node, "*", {"figure", "image"}):
+                images_file.add(monostyle_io.path_to_rel(monostyle_io.path_to_abs(
+                                str(node.head.code).strip(), "doc"), "img"))
+        return images_file
+
+    def visit(document):
+        return visit_part(document.body, set())
+
+    def finish(contributions):
+        for images_file in contributions.values():
+            images.update(images_file)
+
+    Corpus().register("unused-image", visit, finish)
     return {"data": images}
 
 
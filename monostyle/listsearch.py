@@ -12,8 +12,9 @@
 from monostyle.util.report import Report
 import monostyle.rst_parser.walker as rst_walker
 from monostyle.util.segmenter import Segmenter
+from monostyle.util.token_table import get_token_table
 from monostyle.util.fragment import Fragment
-from monostyle.util.porter_stemmer import Porterstemmer
+from monostyle.util.stemmer import Stemmer
 
 
 def compile_terms(terms, conf):
@@ -61,14 +62,11 @@ def combine_message(pattern_str, message, conf):
         return (conf.get("message prefix", "") + message + conf.get("message suffix", ""),
                 has_default)
 
-    def compile_tokenized(pattern_str, conf_flags_local, porter_stemmer):
+    def compile_tokenized(pattern_str, conf_flags_local, stemmer):
         segmenter = Segmenter()
-        pattern = []
-        for word in segmenter.iter_word(Fragment("", pattern_str)):
-            if not conf_flags_local or conf_flags_local["stem"]:
-                pattern.append(porter_stemmer.stem(str(word), 0, len(word)-1))
-            else:
-                pattern.append(str(word))
+        pattern = [str(word) for word in segmenter.iter_word(Fragment("", pattern_str))]
+        if not conf_flags_local or conf_flags_local["stem"]:
+            pattern = stemmer.stem_many(pattern)
 
         return [tuple(pattern), 0, conf_flags_local, None]
 
@@ -105,7 +103,7 @@ def combine_pattern(pattern_str, conf):
 
         return pattern_str, conf_flags_local if conf_flags_local is not conf["flags"] else None
 
-    porter_stemmer = Porterstemmer()
+    stemmer = Stemmer()
     terms_compiled = []
     flags = convert_flags(conf["flags"])
 
@@ -140,7 +138,7 @@ def combine_pattern(pattern_str, conf):
                 continue
             if conf["flags"]["token"]:
                 terms_compiled.append((compile_tokenized(pattern_str, conf_flags_local,
-                                       porter_stemmer), message))
+                                       stemmer), message))
             elif conf_flags_local:
                 terms_compiled.append((re.compile(pattern_str, convert_flags(conf_flags_local)),
                                        message))
@@ -209,10 +207,10 @@ def search_char(toolname, document, reports, data, config):
     for part in rst_walker.iter_nodeparts_instr(document.body, instr_pos, instr_neg):
         part_str = str(part.code)
         for pattern, message in data:
-            for m in re.finditer(pattern, part_str):
+            for output in part.code.slice_matches(m.span() for m in
+                                                  re.finditer(pattern, part_str)):
                 reports.append(
-                    Report(config.get("severity", 'I'), toolname,
-                           part.code.slice_match(m, 0), message)
+                    Report(config.get("severity", 'I'), toolname, output, message)
                     .set_line_punc(document.body.code, 50, 30))
 
     return reports
@@ -221,8 +219,7 @@ def search_char(toolname, document, reports, data, config):
 def search_token(toolname, document, reports, data, config):
     """Search terms in document within word boundaries."""
     toolname = "search-token"
-    segmenter = Segmenter()
-    porter_stemmer = Porterstemmer()
+    memo = rst_walker.get_memo(document.body)
 
     instr_pos = {
         "sect": {"*": ["name"]},
@@ -244,12 +241,13 @@ def search_token(toolname, document, reports, data, config):
     }
 
     for part in rst_walker.iter_nodeparts_instr(document.body, instr_pos, instr_neg):
-        for word in segmenter.iter_word(part.code):
+        tokens = get_token_table(memo, part.code)
+        for word in tokens.words():
             word_str = str(word)
             if config["flags"]["ignorecase"]:
                 word_str = word_str.lower()
             if config["flags"]["stem"]:
-                word_stem = porter_stemmer.stem(word_str, 0, len(word_str)-1)
+                word_stem = tokens.stem(word_str)
 
             for pattern, message in data:
                 word_match = word_str
@@ -757,12 +757,12 @@ def leak(toolname, document, reports, re_lib, data):
                                    else mapper_portion["*"])
             for key in mapper_portion_part:
                 # cut section
-                on_mc_trans = bool(not node.prev and key == "mc" and node.node_name == "trans")
-                for m in re.finditer(re_lib[key][0], part_str):
-                    if on_mc_trans:
-                        continue
+                if not node.prev and key == "mc" and node.node_name == "trans":
+                    continue
+                for output in part.code.slice_matches(m.span() for m in
+                                                      re.finditer(re_lib[key][0], part_str)):
                     reports.append(
-                        Report('F', toolname, part.code.slice_match(m, 0), re_lib[key][1])
+                        Report('F', toolname, output, re_lib[key][1])
                         .set_line_offset(part.parent_node.code, 100))
 
 
@@ -9,37 +9,46 @@
 import re
 from difflib import SequenceMatcher
 
-import monostyle.util.monostyle_io as monostyle_io
 from monostyle.util.fragment import Fragment
 from monostyle.util.report import Report
-from monostyle.rst_parser.core import RSTParser
+from monostyle.rst_parser.corpus import Corpus
 import monostyle.rst_parser.environment as env
 import monostyle.rst_parser.walker as rst_walker
-from monostyle.util.porter_stemmer import Porterstemmer
+from monostyle.util.stemmer import Stemmer
 
 
 def glossary_pre(_):
-    rst_parser = RSTParser()
     terms = set()
     terms_glossary = set()
-    glossary_code = None
     glossary_filenames = []
-    for filename, text in monostyle_io.doc_texts():
-        document = rst_parser.parse(rst_parser.document(filename, text))
 
+    def visit(document):
+        terms_file = set()
+        terms_glossary_file = set()
+        glossary_code = None
         for node in rst_walker.iter_node(document.body, ("dir", "role",)):
             if rst_walker.is_of(node, "*", "glossary"):
                 glossary_code = node.code
-                glossary_filenames.append(glossary_code.filename)
 
             elif rst_walker.is_of(node, "*", "term"):
                 if glossary_code and glossary_code.is_in_span(node.code.start_pos):
-                    terms_glossary.add(str(node.head).strip())
+                    terms_glossary_file.add(str(node.head).strip())
                 else:
-                    terms.add(str(node.head).strip())
+                    terms_file.add(str(node.head).strip())
 
-    terms_glossary -= terms
-    terms.update(terms_glossary)
+        return bool(glossary_code), terms_file, terms_glossary_file
+
+    def finish(contributions):
+        for filename, (has_glossary, terms_file, terms_glossary_file) in contributions.items():
+            if has_glossary:
+                glossary_filenames.append(filename)
+            terms.update(terms_file)
+            terms_glossary.update(terms_glossary_file)
+
+        terms_glossary.difference_update(terms)
+        terms.update(terms_glossary)
+
+    Corpus().register("glossary", visit, finish)
     args = dict()
     args["data"] = dict(terms=terms, terms_glossary=terms_glossary,
                         glossary_filenames=glossary_filenames)
@@ -69,15 +78,15 @@ def glossary(toolname, document, reports, data):
 
 
 def link_titles_pre(_):
-    _, targets = env.get_link_titles(RSTParser())
+    _, targets = env.collect_link_titles()
 
     return {"data": targets}
 
 
 def link_titles(toolname, document, reports, data):
     """Find internal (ref) links title mismatches the heading title."""
-    for node in rst_walker.iter_node(document.body, "role"):
-        if rst_walker.is_of(node, "*", "ref") and node.head:
+    for node in rst_walker.iter_node_named(document.body, "role", "ref"):
+        if node.head:
             id_str = str(node.id.code).strip()
             for target, title_head in data.items():
                 if target == id_str:
@@ -95,19 +104,27 @@ def link_titles(toolname, document, reports, data):
 def local_targets_pre(_):
     links = []
     targets = []
-    rst_parser = RSTParser()
 
-    for filename, text in monostyle_io.doc_texts():
-        document = rst_parser.parse(rst_parser.document(filename, text))
+    def visit(document):
+        targets_file = []
+        links_file = []
         for node in rst_walker.iter_node(document.body, {"target", "role"}):
             if node.node_name == "target":
                 if (document.code.filename.endswith("index.rst") or
                         str(node.id.code).startswith("bpy.")):
                     continue
-                targets.append(node)
+                targets_file.append(node.id.code)
             elif rst_walker.is_of(node, "role", "ref"):
-                links.append(node.id.code)
+                links_file.append(node.id.code)
+
+        return targets_file, links_file
 
+    def finish(contributions):
+        for targets_file, links_file in contributions.values():
+            targets.extend(targets_file)
+            links.extend(links_file)
+
+    Corpus().register("local-targets", visit, finish)
     args = dict()
     args["data"] = dict(targets=targets, links=links)
     return args
@@ -115,13 +132,13 @@ def local_targets_pre(_):
 
 def local_targets(toolname, reports, data):
     """Find internal (ref) links used on same page only."""
-    for node in data["targets"]:
+    for id_code in data["targets"]:
         is_same_file = False
         is_multi = False
-        id_str = str(node.id.code).strip()
+        id_str = str(id_code).strip()
         for link_code in data["links"]:
             if id_str == str(link_code).strip():
-                if node.code.filename == link_code.filename:
+                if id_code.filename == link_code.filename:
                     is_same_file = True
                 else:
                     is_multi = True
@@ -130,28 +147,24 @@ def local_targets(toolname, reports, data):
         # false positives: non heading targets, title not heading
         if is_same_file and not is_multi:
             if not id_str.startswith("fig-") and not id_str.startswith("tab-"):
-                reports.append(Report('I', toolname, node.id.code, "local target"))
+                reports.append(Report('I', toolname, id_code, "local target"))
 
     return reports
 
 
 def page_name(toolname, document, reports):
     """Compare page title and file name."""
-    porter_stemmer = Porterstemmer()
+    stemmer = Stemmer()
 
     page = re.search(r"/([\w\-_]+?)(?:/index)?\.rst$", document.code.filename).group(1)
-    page_split = []
-    for word in re.split(r"[_-]", page):
-        page_split.append(porter_stemmer.stem(word, 0, len(word)-1))
+    page_split = stemmer.stem_many(re.split(r"[_-]", page))
 
     threshold = (0.5, 0.33, 0.25)
     for node in rst_walker.iter_node(document.body, "sect", enter_pos=False):
         head = str(node.name.code).lower().strip()
         head = re.sub(r"\b(\w)\-", r"\1", head)
         head = re.sub(r"[&/,-]", " ", head)
-        head_split = []
-        for word in re.split(r"\s+", head):
-            head_split.append(porter_stemmer.stem(word, 0, len(word)-1))
+        head_split = stemmer.stem_many(re.split(r"\s+", head))
 
         acronym = []
         match_count = 0
@@ -233,21 +246,29 @@ def tool_title(toolname, document, reports):
 def unused_targets_pre(_):
     links = []
     targets = []
-    rst_parser = RSTParser()
 
-    for filename, text in monostyle_io.doc_texts():
-        document = rst_parser.parse(rst_parser.document(filename, text))
+    def visit(document):
+        targets_file = []
+        links_file = []
         for node in rst_walker.iter_node(document.body, {"target", "role", "subst"}):
             if node.node_name == "target":
                 if (document.code.filename.endswith("index.rst") or
                         str(node.id.code).startswith("bpy.")):
                     continue
-                targets.append(node)
+                targets_file.append(node.id.code)
             elif (rst_walker.is_of(node, "role", "ref") or
                     (node.node_name == "subst" and
                      str(node.body_end.code).strip().endswith("_"))):
-                links.append(str(node.id.code).strip())
+                links_file.append(str(node.id.code).strip())
+
+        return targets_file, links_file
+
+    def finish(contributions):
+        for targets_file, links_file in contributions.values():
+            targets.extend(targets_file)
+            links.extend(links_file)
 
+    Corpus().register("unused-targets", visit, finish)
     args = dict()
     args["data"] = dict(targets=targets, links=links)
     return args
@@ -255,9 +276,9 @@ def unused_targets_pre(_):
 
 def unused_targets(toolname, reports, data):
     """Find unused internal (ref) targets."""
-    for node in data["targets"]:
-        if str(node.id.code).strip() not in data["links"]:
-            reports.append(Report('W', toolname, node.id.code, "unused target"))
+    for id_code in data["targets"]:
+        if str(id_code).strip() not in data["links"]:
+            reports.append(Report('W', toolname, id_code, "unused target"))
 
     return reports
 
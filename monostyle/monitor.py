@@ -52,4 +52,4 @@ def check(toolname, document, reports, config):
 
 check.register = []
 
-OPS = (("monitor", check, check_pre),)
+OPS = (("monitor", check, check_pre, None),)
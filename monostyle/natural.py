@@ -10,12 +10,12 @@
 
 import monostyle.util.monostyle_io as monostyle_io
 from monostyle.util.report import Report
-from monostyle.rst_parser.core import RSTParser
+from monostyle.rst_parser.corpus import Corpus
 import monostyle.rst_parser.walker as rst_walker
 from monostyle.util.segmenter import Segmenter
+from monostyle.util.token_table import get_token_table
 from monostyle.util.part_of_speech import PartofSpeech
 from monostyle.util.lexicon import Lexicon
-from monostyle.util.porter_stemmer import Porterstemmer
 
 
 def abbreviation_pre(_):
@@ -28,7 +28,6 @@ def is_explanation(abbr, desc):
 
         return "".join(desc_split).upper().endswith(abbr.rstrip('s').upper())
 
-    rst_parser = RSTParser()
     segmenter = Segmenter()
     part_of_speech = PartofSpeech()
     explanations = dict()
@@ -63,9 +62,7 @@ def is_explanation(abbr, desc):
     after_test_re = re.compile(r"\A\s*?\(")
     after_re = re.compile(r"\A\s*?\(([^\)]+?)\)")
 
-    for filename, text in monostyle_io.doc_texts():
-        document = rst_parser.parse(rst_parser.document(filename, text))
-
+    def visit(document):
         # todo glossary terms as explanation?
         explanation_file = []
         for node in rst_walker.iter_node(document.body, "role", enter_pos=False):
@@ -74,14 +71,13 @@ def is_explanation(abbr, desc):
 
             explanation_file.append((str(node.head.code).strip(), node.head.code.start_pos))
 
-        explanations[filename] = explanation_file
-
         # Plain text/no markup explanations.
         for part in rst_walker.iter_nodeparts_instr(document.body, instr_pos, instr_neg):
-            for word in segmenter.iter_word(part.code):
+            for word in segmenter.iter_word(part.code, lazy=True):
                 if not part_of_speech.isacr(word) and not part_of_speech.isabbr(word):
                     continue
 
+                word = word.fragment()
                 word_str = str(word).strip()
                 before, _, after = part.code.slice(word.start_pos, word.end_pos, plenary=True)
                 if re.match(after_test_re, str(after)):
@@ -97,6 +93,9 @@ def is_explanation(abbr, desc):
                         if is_explanation(word_str, before_m.group(1)):
                             explanation_file.append((word_str, word.start_pos))
 
+        return explanation_file
+
+    Corpus().register("abbreviation", visit, explanations.update)
     args = dict()
     args["data"] = {"explanations": explanations, "ignore": ignore}
     args["config"] = {"instr_pos": instr_pos, "instr_neg": instr_neg}
@@ -105,12 +104,12 @@ def is_explanation(abbr, desc):
 
 def abbreviation(toolname, document, reports, data, config):
     """Search for abbreviation/acronyms without an explanation."""
-    segmenter = Segmenter()
+    memo = rst_walker.get_memo(document.body)
     part_of_speech = PartofSpeech()
 
     for part in rst_walker.iter_nodeparts_instr(document.body,
                                                 config["instr_pos"], config["instr_neg"]):
-        for word in segmenter.iter_word(part.code):
+        for word in get_token_table(memo, part.code).words():
             if not part_of_speech.isacr(word) and not part_of_speech.isabbr(word):
                 continue
             if str(word).upper() in data["ignore"]:
@@ -186,7 +185,7 @@ def article_pre(_):
 
 def article(toolname, document, reports, re_lib, data):
     """Check correct use of indefinite articles (a and an)."""
-    segmenter = Segmenter()
+    memo = rst_walker.get_memo(document.body)
     part_of_speech = PartofSpeech()
     vowel_re = re_lib["vowel"]
     digit_re = re_lib["digit"]
@@ -216,8 +215,9 @@ def article(toolname, document, reports, re_lib, data):
                 is_a = None
             continue
 
-        for sen, stop in segmenter.iter_sentence(part.code):
-            for word in segmenter.iter_word(sen, filter_numbers=False):
+        tokens = get_token_table(memo, part.code)
+        for index, (sen, stop) in enumerate(tokens.sentences()):
+            for word in tokens.sentence_words(index, filter_numbers=False):
                 word_str = str(word).strip()
                 if len(word) < 3 and word_str in {"a", "A", "an", "An"}:
                     is_a = bool(word_str in {"a", "A"})
@@ -473,7 +473,7 @@ def compare(node_cur, sen_full, counter, reports, sub_para=False, is_last=False)
 
         return reports
 
-    segmenter = Segmenter()
+    memo = rst_walker.get_memo(document.body)
     instr_pos = {
         "sect": {"*": ["name"]},
         "*": {"*": ["head", "body"]}
@@ -543,8 +543,9 @@ def compare(node_cur, sen_full, counter, reports, sub_para=False, is_last=False)
                 if node_cur.node_name == "sect":
                     counter["sect"] += len(part.code)
                 else:
-                    for sen, stop in segmenter.iter_sentence(part.code):
-                        for word in segmenter.iter_word(sen):
+                    tokens = get_token_table(memo, part.code)
+                    for index, (sen, stop) in enumerate(tokens.sentences()):
+                        for word in tokens.sentence_words(index):
                             counter["sen"] += 1
                             if len(word) >= conf["word_len"]:
                                 reports.append(
@@ -639,7 +640,7 @@ def add_report(document, reports, word, thresholds, score, count):
         words.reset()
         return reports
 
-    segmenter = Segmenter()
+    memo = rst_walker.get_memo(document.body)
     part_of_speech = PartofSpeech()
     instr_pos = {
         "sect": {"*": ["name"]},
@@ -691,8 +692,9 @@ def add_report(document, reports, word, thresholds, score, count):
         if word:
             # add per average word length in skipped code
             counter += (part.code.start_pos - word.end_pos) // 6
-        for sen, stop in segmenter.iter_sentence(part.code):
-            for word in segmenter.iter_word(sen):
+        tokens = get_token_table(memo, part.code)
+        for index, (sen, stop) in enumerate(tokens.sentences()):
+            for word in tokens.sentence_words(index):
                 counter += 1
                 word_str = str(word).lower()
                 tag = part_of_speech.tag(word_str)
@@ -800,10 +802,10 @@ def search_pure(toolname, document, reports, re_lib, config):
     for part in rst_walker.iter_nodeparts_instr(document.body, instr_pos, instr_neg):
         for pattern, message in re_lib.values():
             part_str = str(part.code)
-            for m in re.finditer(pattern, part_str):
+            for output in part.code.slice_matches(m.span() for m in
+                                                  re.finditer(pattern, part_str)):
                 reports.append(
-                    Report(config.get("severity"), toolname,
-                           part.code.slice_match(m, 0), message)
+                    Report(config.get("severity"), toolname, output, message)
                     .set_line_punc(document.body.code, 50, 30))
 
     return reports
@@ -817,7 +819,7 @@ def repeated_pre(toolname):
 
 def repeated(toolname, document, reports, config):
     """Find repeated words e.g. the the example."""
-    def stemmer_patch(porter_stemmer, word_lower):
+    def stemmer_patch(tokens, word_lower):
         """Distinguish some words."""
         # on vs. one
         if word_lower in {"one", "ones"}:
@@ -826,10 +828,9 @@ def stemmer_patch(porter_stemmer, word_lower):
         if word_lower in {"use", "uses", "used"}:
             return "use"
 
-        return porter_stemmer.stem(word_lower, 0, len(word_lower)-1)
+        return tokens.stem(word_lower)
 
-    porter_stemmer = Porterstemmer()
-    segmenter = Segmenter()
+    memo = rst_walker.get_memo(document.body)
     buf_size = config["buf_size"]
 
     instr_pos = {
@@ -866,10 +867,11 @@ def stemmer_patch(porter_stemmer, word_lower):
 
                 buf.append("")
 
-            for sen, stop in segmenter.iter_sentence(part.code):
-                for word in segmenter.iter_word(sen):
+            tokens = get_token_table(memo, part.code)
+            for index, (sen, stop) in enumerate(tokens.sentences()):
+                for word in tokens.sentence_words(index):
                     word_lower = str(word).lower()
-                    word_stem = stemmer_patch(porter_stemmer, word_lower)
+                    word_stem = stemmer_patch(tokens, word_lower)
 
                     for distance, word_buf in enumerate(reversed(buf)):
                         if word_buf == word_stem:
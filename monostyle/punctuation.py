@@ -162,11 +162,12 @@ def is_sentence(part, par_node, instr_pos, instr_neg, space_re):
                 if key in {"puncend", "commaend"}:
                     continue
                 pattern = value[0]
-                for m in re.finditer(pattern, part_str):
-                    if m.start() == 0 and key == "closesol" and part.parent_node.prev:
-                        continue
+                is_closesol = bool(key == "closesol" and part.parent_node.prev)
+                for output in part.code.slice_matches(
+                        m.span() for m in re.finditer(pattern, part_str)
+                        if not (is_closesol and m.start() == 0)):
                     reports.append(
-                        Report('W', toolname, part.code.slice_match(m, 0), value[1])
+                        Report('W', toolname, output, value[1])
                         .set_line_punc(document.body.code, 50, 30))
 
 
@@ -0,0 +1,185 @@
+
+"""
+rst_parser.cache
+~~~~~~~~~~~~~~~~
+
+Persistent storage of parsed documents.
+"""
+
+import os
+import hashlib
+import pickle
+
+import monostyle.config as config
+import monostyle.util.monostyle_io as monostyle_io
+from monostyle.rst_parser.compact import CompactTree
+
+
+def parser_version():
+    """Return a hash of the modules which determine the parse result."""
+    if parser_version.value is None:
+        import monostyle
+        hasher = hashlib.sha1(monostyle.__version__.encode("utf-8"))
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        for filename in ("rst_parser/core.py", "rst_parser/rst_node.py",
+                         "util/fragment.py", "util/nodes.py", "rst_parser/cache.py",
+                         "rst_parser/compact.py"):
+            try:
+                with open(os.path.join(base_dir, filename), "rb") as module_file:
+                    hasher.update(module_file.read())
+            except (IOError, OSError):
+                hasher.update(filename.encode("utf-8"))
+
+        parser_version.value = hasher.hexdigest()[:16]
+    return parser_version.value
+
+parser_version.value = None
+
+
+class ParseCache:
+    """Parsed documents stored in the user config folder.
+    Entries are keyed by the content hash and the parser version.
+    The least recently used entries are evicted when the size limit is exceeded.
+    """
+
+    def __init__(self, directory=None, max_size=None):
+        """
+        directory -- storage folder, disabled if its parent folder does not exist.
+        max_size -- size limit in megabytes.
+        """
+        if directory is None:
+            directory = monostyle_io.path_to_abs("monostyle/cache")
+        if max_size is None:
+            max_size = monostyle_io.get_branch(config.cache_options, ("max_size",), silent=True)
+            if max_size is None:
+                max_size = 100
+
+        self.max_size = max_size * 1024 ** 2
+        self.directory = None
+        self._size = None
+        if os.path.isdir(os.path.dirname(directory)):
+            try:
+                os.makedirs(directory, exist_ok=True)
+                self.directory = directory
+            except (IOError, OSError) as err:
+                print("{0}: cannot create: {1}".format(directory, err))
+
+
+    def __bool__(self):
+        """Is enabled."""
+        return self.directory is not None
+
+
+    def key(self, code):
+        """Return the key of the code."""
+        hasher = hashlib.sha1(parser_version().encode("utf-8"))
+        hasher.update(repr((code.filename, code.start_pos, code.start_lincol)).encode("utf-8"))
+        hasher.update(str(code).encode("utf-8"))
+        return hasher.hexdigest()
+
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+
+    def load(self, code):
+        """Return the stored document and the parse warnings or None if not stored."""
+        if not self or code.is_bundle():
+            return None
+
+        filename = self._entry_path(self.key(code))
+        try:
+            with open(filename, "rb") as cache_file:
+                data = pickle.load(cache_file)
+            os.utime(filename)
+        except (IOError, OSError):
+            return None
+        except (pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            self._remove(filename)
+            return None
+
+        return deserialize(data[0], code), data[1]
+
+
+    def store(self, document, warnings=()):
+        """Store the document with the warnings which occurred during its parsing."""
+        if not self or document.code.is_bundle():
+            return
+
+        filename = self._entry_path(self.key(document.code))
+        filename_temp = filename + ".{0}.tmp".format(os.getpid())
+        try:
+            with open(filename_temp, "wb") as cache_file:
+                pickle.dump((serialize(document), tuple(warnings)), cache_file,
+                            pickle.HIGHEST_PROTOCOL)
+            os.replace(filename_temp, filename)
+        except (IOError, OSError, pickle.PicklingError) as err:
+            print("{0}: cannot write cache: {1}".format(filename, err))
+            self._remove(filename_temp)
+            return
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._iter_entries())
+        else:
+            self._size += os.path.getsize(filename)
+        if self._size > self.max_size:
+            self.evict()
+
+
+    def _iter_entries(self):
+        """Yield the filename, size and last access time of the entries."""
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(".pickle"):
+                        stat = entry.stat()
+                        yield entry.path, stat.st_size, stat.st_mtime
+        except (IOError, OSError):
+            return
+
+
+    def _remove(self, filename):
+        try:
+            os.remove(filename)
+        except (IOError, OSError):
+            pass
+
+
+    def evict(self, max_size=None):
+        """Remove least recently used entries until the cache fits into the size limit."""
+        if not self:
+            return
+        if max_size is None:
+            max_size = self.max_size
+
+        entries = sorted(self._iter_entries(), key=lambda entry: entry[2])
+        self._size = sum(size for _, size, _ in entries)
+        for filename, size, _ in entries:
+            if self._size <= max_size:
+                break
+            self._remove(filename)
+            self._size -= size
+
+
+    def clear(self):
+        """Remove all entries and the other data stored in the folder."""
+        self.evict(0)
+        if self:
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith(".index"):
+                    self._remove(entry.path)
+
+
+# -- Serialization -----------------------------------------------------------
+
+def serialize(document):
+    """Pack the document tree into flat arrays.
+    The Fragments matching the source are stored as locations.
+    """
+    return CompactTree(document)
+
+
+def deserialize(tree, source):
+    """Rebuild the document tree from the packed arrays."""
+    tree.source = source
+    return tree.document(lazy=False)
@@ -0,0 +1,322 @@
+"""
+rst_parser.compact
+~~~~~~~~~~~~~~~~~~
+
+Compact storage of parsed documents in flat arrays.
+"""
+
+from array import array
+from functools import partial
+
+from monostyle.util.nodes import LazyLinkedList
+from monostyle.rst_parser.rst_node import NodeRST, NodePartRST
+
+
+_part_slots = ('indent', 'name_start', 'name', 'name_end', 'id_start', 'id', 'id_end',
+               'head', 'attr', 'body_start', 'body', 'body_end')
+
+
+def _narrow(values):
+    """Return the array with the smallest signed item size fitting the values."""
+    if not values:
+        return values
+    low = min(values)
+    high = max(values)
+    for typecode in ('b', 'h', 'i', 'q'):
+        item_bits = array(typecode).itemsize * 8
+        if -(1 << (item_bits - 1)) <= low and high < (1 << (item_bits - 1)):
+            break
+    if typecode == values.typecode:
+        return values
+    return array(typecode, values)
+
+
+class CompactTree:
+    """Document tree stored as parallel arrays in pre-order.
+    Nodes and parts are materialized on demand as NodeRST and NodePartRST
+    with lazy child nodes, so the walkers and tools work on them as on a parsed tree.
+    Parts assigned to a slot but not being a child are stored after the tree.
+    When pickled the source is left out and has to be set after loading.
+    """
+
+    __slots__ = ('source', '_name_table', '_name_ids', '_names', '_is_part',
+                 '_parent', '_first_child', '_next_sibling',
+                 '_start_pos', '_end_pos', '_start_lincol', '_end_lincol',
+                 '_codes', '_slots', '_tree_len', '_facades')
+
+
+    def __init__(self, document):
+        """
+        document -- parsed document tree, its code is the source of the Fragments.
+        """
+        self.source = document.code
+        self._name_table = []
+        self._name_ids = {}
+        self._names = array('H')
+        self._is_part = array('b')
+        self._parent = array('i')
+        self._first_child = array('i')
+        self._next_sibling = array('i')
+        self._start_pos = array('q')
+        self._end_pos = array('q')
+        # line and column interleaved, -1 for no lincol
+        self._start_lincol = array('i')
+        self._end_lincol = array('i')
+        # code not a view of the source
+        self._codes = {}
+        # slots not bound to the last part of the same name
+        self._slots = {}
+        self._facades = {}
+
+        text = str(self.source)
+        detached = []
+        self._pack(document, -1, text, detached)
+        self._tree_len = len(self._names)
+        for index, slot_index, value in detached:
+            slots = self._slots[index]
+            slots[slot_index] = (slots[slot_index][0], self._pack(value, -1, text, detached))
+
+
+    def __getstate__(self):
+        """Leave out the source and the materialized nodes.
+        The arrays are stored with the smallest item size fitting their values.
+        """
+        state = {}
+        for prop in CompactTree.__slots__:
+            if prop in {'source', '_facades'}:
+                continue
+            value = getattr(self, prop)
+            if isinstance(value, array):
+                value = _narrow(value)
+            state[prop] = value
+        return None, state
+
+
+    def __setstate__(self, state):
+        for prop, value in state[1].items():
+            setattr(self, prop, value)
+        self.source = None
+        self._facades = {}
+
+
+    def _pack(self, node, parent, text, detached):
+        """Append the node and its descendants.
+        detached -- collects the slot parts which are not a child.
+        """
+        index = len(self._names)
+        node_name = node.node_name
+        if (name_id := self._name_ids.get(node_name)) is None:
+            name_id = len(self._name_table)
+            self._name_ids[node_name] = name_id
+            self._name_table.append(node_name)
+        self._names.append(name_id)
+        self._is_part.append(not isinstance(node, NodeRST))
+        self._parent.append(parent)
+        self._first_child.append(-1)
+        self._next_sibling.append(-1)
+        self._pack_code(index, node.code, text)
+
+        prev = -1
+        children = []
+        for child in node.child_nodes:
+            child_index = self._pack(child, index, text, detached)
+            if prev == -1:
+                self._first_child[index] = child_index
+            else:
+                self._next_sibling[prev] = child_index
+            prev = child_index
+            children.append((child, child_index))
+
+        if isinstance(node, NodeRST):
+            bound = {child.node_name: child for child, _ in children
+                     if child.node_name in _part_slots}
+            slots = []
+            for slot in _part_slots:
+                if (value := getattr(node, slot)) is not bound.get(slot):
+                    if value is not None:
+                        for child, child_index in children:
+                            if child is value:
+                                value = child_index
+                                break
+                        else:
+                            detached.append((index, len(slots), value))
+                    slots.append((slot, value))
+            if slots:
+                self._slots[index] = slots
+
+        return index
+
+
+    def _pack_code(self, index, code, text):
+        """Store the location of the code or the code itself."""
+        source = self.source
+        if code is not None and not code.is_bundle() and code.filename == source.filename:
+            start = code.start_pos - source.start_pos
+            end = code.end_pos - source.start_pos
+            if 0 <= start <= end <= len(text) and code.is_split_text(text[start:end]):
+                self._start_pos.append(code.start_pos)
+                self._end_pos.append(code.end_pos)
+                for lincol, lincol_array in ((code.start_lincol, self._start_lincol),
+                                             (code.end_lincol, self._end_lincol)):
+                    lincol_array.extend(lincol if lincol is not None else (-1, -1))
+                return
+
+        self._codes[index] = code
+        self._start_pos.append(-1)
+        self._end_pos.append(-1)
+        self._start_lincol.extend((-1, -1))
+        self._end_lincol.extend((-1, -1))
+
+
+    def __len__(self):
+        return self._tree_len
+
+
+    def node_name(self, index):
+        """Return the node_name of the entry."""
+        return self._name_table[self._names[index]]
+
+
+    def is_part(self, index):
+        """Check if the entry is a node part."""
+        return bool(self._is_part[index])
+
+
+    def parent(self, index):
+        """Return the index of the parent or -1."""
+        return self._parent[index]
+
+
+    def iter_children(self, index):
+        """Iterate over the indices of the child entries."""
+        child = self._first_child[index]
+        while child != -1:
+            yield child
+            child = self._next_sibling[child]
+
+
+    def code(self, index):
+        """Return the code of the entry."""
+        if index in self._codes:
+            return self._codes[index]
+
+        lincols = []
+        for lincol_array in (self._start_lincol, self._end_lincol):
+            lincol = (lincol_array[2 * index], lincol_array[2 * index + 1])
+            lincols.append(lincol if lincol[0] != -1 else None)
+        return self.source.view(self._start_pos[index], self._end_pos[index], *lincols)
+
+
+    def iter_index(self, names=None, parts=False):
+        """Iterate over the indices of the entries in document order.
+        names -- node_name must positive match.
+        parts -- iterate over node parts instead of nodes.
+        """
+        if isinstance(names, str):
+            names = {names,}
+        is_part = self._is_part
+        if names is None:
+            for index in range(self._tree_len):
+                if is_part[index] == parts:
+                    yield index
+            return
+
+        name_ids = {self._name_ids[name] for name in names if name in self._name_ids}
+        for index, name_id in zip(range(self._tree_len), self._names):
+            if name_id in name_ids and is_part[index] == parts:
+                yield index
+
+
+    def document(self, lazy=True):
+        """Return the materialized root node.
+        lazy -- materialize the child nodes of the parts on first access,
+                otherwise the whole tree at once.
+        """
+        if not lazy:
+            return self._build()
+        return self.node(0)
+
+
+    def _build(self):
+        """Create all nodes and parts in one pass over the arrays."""
+        name_table = self._name_table
+        codes = self._codes
+        view = self.source.view
+        # pairs of line and column
+        start_lincols = iter(self._start_lincol)
+        end_lincols = iter(self._end_lincol)
+
+        nodes = []
+        for index, (name_id, is_part, parent, start_pos, end_pos,
+                    start_line, start_col, end_line, end_col) in enumerate(zip(
+                        self._names, self._is_part, self._parent, self._start_pos, self._end_pos,
+                        start_lincols, start_lincols, end_lincols, end_lincols)):
+            node_name = name_table[name_id]
+            new = NodePartRST(node_name, None) if is_part else NodeRST(node_name, None)
+            if start_pos == -1 and index in codes:
+                new.code = codes[index]
+            else:
+                new.code = view(start_pos, end_pos,
+                                (start_line, start_col) if start_line != -1 else None,
+                                (end_line, end_col) if end_line != -1 else None)
+
+            nodes.append(new)
+            if parent != -1:
+                parent_node = nodes[parent]
+                parent_node.child_nodes.append(new)
+                if is_part and node_name in _part_slots:
+                    setattr(parent_node, node_name, new)
+
+        for index, slots in self._slots.items():
+            node = nodes[index]
+            for slot, value in slots:
+                setattr(node, slot, nodes[value] if value is not None else None)
+        return nodes[0]
+
+
+    def node(self, index):
+        """Return the materialized node or part linked with its materialized ancestors."""
+        if (facade := self._facades.get(index)) is not None:
+            return facade
+
+        parent = self._parent[index]
+        if parent == -1:
+            return self._materialize(index)
+        parent_node = self.node(parent)
+        # parts are created with their node
+        if not self._is_part[index]:
+            parent_node.child_nodes.load()
+        return self._facades[index]
+
+
+    def _materialize(self, index):
+        """Create the node with its parts."""
+        if self._is_part[index]:
+            facade = NodePartRST(self.node_name(index), None)
+            facade.code = self.code(index)
+            facade.child_nodes = LazyLinkedList(facade, partial(self._fill, index, facade))
+            self._facades[index] = facade
+            return facade
+
+        facade = NodeRST(self.node_name(index), None)
+        facade.code = self.code(index)
+        self._facades[index] = facade
+        parts = {}
+        for child in self.iter_children(index):
+            part = self._materialize(child)
+            facade.child_nodes.append(part)
+            parts[child] = part
+            if part.node_name in _part_slots:
+                setattr(facade, part.node_name, part)
+
+        for slot, value in self._slots.get(index, ()):
+            if value is not None:
+                value = parts[value] if value in parts else self.node(value)
+            setattr(facade, slot, value)
+        return facade
+
+
+    def _fill(self, index, facade):
+        """Append the child nodes of the part."""
+        for child in self.iter_children(index):
+            facade.child_nodes.append(self._materialize(child))
@@ -7,8 +7,9 @@
 """
 
 import re
+from functools import partial
 from monostyle.util.fragment import Fragment, FragmentBundle
-from monostyle.util.nodes import LinkedList
+from monostyle.util.nodes import LinkedList, LazyLinkedList
 from monostyle.rst_parser.rst_node import NodeRST, NodePartRST
 
 class RSTParser:
@@ -55,9 +56,14 @@ class RSTParser:
     foot_chars = ('*', '†', '‡', '§', '¶', '#', '♠', '♥', '♦', '♣')
 
 
-    def __init__(self):
+    def __init__(self, cache=None):
+        """
+        cache -- ParseCache to load unchanged documents from.
+        """
         self.re_lib = self._compile_re_lib()
         self.warnings = []
+        self.cache = cache
+        self._block_dispatch = {}
 
 
     def _compile_re_lib(self):
@@ -190,6 +196,18 @@ def _compile_re_lib(self):
     }
 
 
+    # Substrings one of which a match of the inline type contains.
+    _inline_needles = {
+        "literal": ("``",), "strong": ("**",), "emphasis": ("*",),
+        "int-target": ("_`",), "role-ft": (":`",), "role-bk": ("`:",),
+        "hyperlink": ("`_",), "dftrole": ("`",), "subst": ("|",),
+        "foot": ("]_",), "cit": ("]_",),
+        "standalone": ("://", "mailto:"), "mail": ("@",),
+        "int-target-sw": ("_",), "hyperlink-sw": ("_",),
+        "link": ("<",), "parenthesis": ("(",),
+    }
+
+
     def warning(self, code, message):
         """Add warning to the log."""
         self.warnings.append("{0}:{1}: {2}".format(code.filename, code.start_lincol[0], message))
@@ -294,7 +312,7 @@ def parse_block(self, node, ind_first_unknown=False):
             if not node.active and (not line_info["is_blank"] or free):
                 if not free :
                     line_info["is_block_start"] = True
-                for _, node_typ in recorder:
+                for node_typ in self._block_starters(line_info):
                     node = node_typ(node, line, line_info)
                     if node.active:
                         break
@@ -315,6 +333,38 @@ def parse_block(self, node, ind_first_unknown=False):
         return root
 
 
+    def _block_starters(self, line_info):
+        """Return the block types in recorder order which can start a node on the line
+        by the first char and indent. The others do nothing without an active node.
+        """
+        line_str = line_info["line_str"]
+        char = line_str.lstrip(' ')[:1]
+        key = (char, "::" in line_str, line_info["indented"])
+        if key in self._block_dispatch:
+            return self._block_dispatch[key]
+
+        starters = []
+        if key[2]:
+            starters.append(self.block_quote)
+        if (char in {":", "|", "-", "/", "(", "#", "_"} or char in self.bullet_chars or
+                char.isalnum()):
+            starters.append(self.listing)
+        if char in {".", "_"} or key[1]:
+            starters.append(self.explicit_block)
+        if char in self.trans_chars:
+            starters.append(self.transition)
+        if char == ">":
+            starters.append(self.doctest)
+        if char == "+":
+            starters.append(self.grid_table)
+        if char == "=":
+            starters.append(self.simple_table)
+        starters.append(self.paragraph)
+
+        self._block_dispatch[key] = tuple(starters)
+        return self._block_dispatch[key]
+
+
     def parse_inline(self, node, name=None):
         new_node = NodeRST("text", node.code)
         new_node.append_part("body", node.code)
@@ -326,6 +376,11 @@ def parse_inline(self, node, name=None):
         if name is not None:
             recorder = (name,)
 
+        # the text nodes are sub strings of the code
+        code_str = str(node.code)
+        recorder = tuple(name for name in recorder
+                         if self._is_inline_candidate(name, code_str))
+
         for name in recorder:
             node.active = node.child_nodes.first()
             while node.active:
@@ -340,12 +395,194 @@ def parse_inline(self, node, name=None):
 
 
     def parse(self, doc):
+        if self.cache:
+            if cached := self.cache.load(doc.code):
+                doc, warnings = cached
+                self.warnings.extend(warnings)
+                return doc
+            warnings_start = len(self.warnings)
+
         doc.body = self.parse_block(doc.body)
         doc.body = self.parse_node(doc.body)
-        doc.body = self.parse_node_inline(doc.body)
+        # stored documents are serialized in full
+        doc.body = self.parse_node_inline(doc.body, lazy=not self.cache)
+
+        if self.cache:
+            self.cache.store(doc, self.warnings[warnings_start:])
         return doc
 
 
+    def reparse(self, doc, changes):
+        """Parse the document with the changes applied.
+        Only the top level nodes touched by the changes and a neighbor on each side are parsed,
+        the other nodes of the document are moved to the new document.
+        Falls back to a full parse if the neighbors are not parsed the same as before.
+        The nodes after the changes are moved and relinked in place,
+        thus the passed document is invalid afterwards.
+
+        doc -- parsed document.
+        changes -- Fragment or FragmentBundle with replacements of pos spans of the document.
+        Raises ValueError if the changes overlap or exceed the document.
+        """
+        source = doc.code
+        changes = sorted(changes, key=lambda change: (change.start_pos, change.end_pos))
+        if not changes:
+            return doc
+
+        text_src = str(source)
+        base = source.start_pos
+        text_pieces = []
+        cursor = 0
+        for change in changes:
+            if change.start_pos - base < cursor or change.end_pos > source.end_pos:
+                raise ValueError("'RSTParser.reparse' changes overlap or exceed the document: {0}"
+                                 .format(source.filename))
+            text_pieces.append(text_src[cursor:change.start_pos - base])
+            text_pieces.append(str(change))
+            cursor = change.end_pos - base
+        text_pieces.append(text_src[cursor:])
+        text = ''.join(text_pieces)
+        code = Fragment(source.filename, text, base, start_lincol=source.start_lincol)
+
+        nodes = doc.body.child_nodes.to_list() if not source.is_bundle() else None
+        if not nodes or not self._is_tiled(nodes, source):
+            return self.parse(self.document(code=code))
+
+        edit_start = changes[0].start_pos
+        edit_end = changes[-1].end_pos
+        index_first = 0
+        while index_first < len(nodes) - 1 and nodes[index_first].code.end_pos < edit_start:
+            index_first += 1
+        index_last = index_first
+        while index_last < len(nodes) - 1 and nodes[index_last + 1].code.start_pos <= edit_end:
+            index_last += 1
+
+        # extend by a neighbor to a line where the parsing starts afresh
+        index_first = max(index_first - 1, 0)
+        while index_first != 0 and not self._is_reset_line(text_src, nodes[index_first], base):
+            index_first -= 1
+        index_last = min(index_last + 1, len(nodes) - 1)
+        while (index_last != len(nodes) - 1 and
+               not self._is_reset_line(text_src, nodes[index_last + 1], base)):
+            index_last += 1
+
+        start = nodes[index_first].code.start_pos - base
+        end = nodes[index_last].code.end_pos - base
+        offset_pos = len(text) - len(text_src)
+        text_window = text[start:end + offset_pos]
+        offset_line = text_window.count('\n') - text_src.count('\n', start, end)
+
+        warnings_start = len(self.warnings)
+        window = self.document(code=Fragment(source.filename, text_window, start + base,
+                                             start_lincol=nodes[index_first].code.start_lincol))
+        window.body = self.parse_block(window.body)
+        window.body = self.parse_node(window.body)
+        window.body = self.parse_node_inline(window.body, lazy=True)
+        nodes_window = window.body.child_nodes.to_list()
+        if (not nodes_window or
+                (nodes[index_first].code.end_pos < edit_start and
+                 not self._is_same_node(nodes_window[0], nodes[index_first], 0, 0)) or
+                (nodes[index_last].code.start_pos > edit_end and
+                 not self._is_same_node(nodes_window[-1], nodes[index_last],
+                                        offset_pos, offset_line))):
+            del self.warnings[warnings_start:]
+            return self.parse(self.document(code=code))
+
+        new_doc = self.document(code=code)
+        for node in nodes[:index_first]:
+            new_doc.body.child_nodes.append(node)
+        for node in nodes_window:
+            new_doc.body.child_nodes.append(node)
+        moved = set()
+        for node in nodes[index_last + 1:]:
+            self._move_node(node, offset_pos, offset_line, moved)
+            new_doc.body.child_nodes.append(node)
+
+        return new_doc
+
+
+    def _is_tiled(self, nodes, source):
+        """Check if the nodes cover the source without gaps starting at line starts."""
+        pos = source.start_pos
+        for node in nodes:
+            if (node.code is None or node.code.is_bundle() or node.code.start_pos != pos or
+                    (node.code.start_lincol and node.code.start_lincol[1] != 0)):
+                return False
+            pos = node.code.end_pos
+        return pos == source.end_pos
+
+
+    def _is_reset_line(self, text, node, base):
+        """Check if the node starts with an unindented line after a blank line
+        which closes the blocks before unless it continues a list.
+        """
+        start = node.code.start_pos - base
+        if start == 0:
+            return True
+        if text[start:start + 1] in {"", " ", "\n"}:
+            return False
+        line_start = text.rfind('\n', 0, start - 1) + 1
+        return text[line_start:start].isspace()
+
+
+    def _is_same_node(self, node, other, offset_pos, offset_line):
+        """Check if the nodes have the same structure and location after the offset."""
+        def is_same_code(code, code_other):
+            if code is None or code_other is None:
+                return code is None and code_other is None
+            pieces = list(code)
+            pieces_other = list(code_other)
+            if len(pieces) != len(pieces_other):
+                return False
+            for piece, piece_other in zip(pieces, pieces_other):
+                if (piece.start_pos != piece_other.start_pos + offset_pos or
+                        piece.end_pos != piece_other.end_pos + offset_pos):
+                    return False
+                for lincol, lincol_other in ((piece.start_lincol, piece_other.start_lincol),
+                                             (piece.end_lincol, piece_other.end_lincol)):
+                    if lincol_other is not None:
+                        lincol_other = (lincol_other[0] + offset_line, lincol_other[1])
+                    if lincol != lincol_other:
+                        return False
+            return True
+
+        if (node.node_name != other.node_name or not is_same_code(node.code, other.code) or
+                len(node.child_nodes) != len(other.child_nodes)):
+            return False
+        for part, part_other in zip(node.child_nodes, other.child_nodes):
+            if (part.node_name != part_other.node_name or
+                    not is_same_code(part.code, part_other.code) or
+                    len(part.child_nodes) != len(part_other.child_nodes)):
+                return False
+            for child, child_other in zip(part.child_nodes, part_other.child_nodes):
+                if not self._is_same_node(child, child_other, offset_pos, offset_line):
+                    return False
+        return True
+
+
+    def _move_node(self, node, offset_pos, offset_line, moved):
+        """Move the Fragments of the node and its descendants.
+        moved -- ids of the moved Fragments and nodes, shared between the nodes.
+        """
+        if node is None or id(node) in moved:
+            return
+        moved.add(id(node))
+        code = node.code
+        if code is not None:
+            for piece in code:
+                if id(piece) in moved:
+                    piece.move(-offset_pos, (-offset_line, 0), is_rel=True, keep_bounds=False)
+            code.move(offset_pos, (offset_line, 0), is_rel=True, keep_bounds=False)
+            moved.update(id(piece) for piece in code)
+
+        # the inline parsing of pending parts uses the moved code
+        if isinstance(node.child_nodes, LazyLinkedList) and not node.child_nodes.is_loaded():
+            return
+        for child in node.child_nodes:
+            self._move_node(child, offset_pos, offset_line, moved)
+        self._move_node(node.active, offset_pos, offset_line, moved)
+
+
     def parse_node(self, root):
         for node in root.child_nodes:
             if (node.node_name != "text" and
@@ -373,30 +610,40 @@ def parse_node(self, root):
         return root
 
 
-    def parse_node_inline(self, root):
+    def parse_node_inline(self, root, lazy=False):
+        """Parse the inline markup of the parts.
+        lazy -- defer the parsing of each part to the first access of its child nodes.
+        """
+        parse_inline = self.parse_inline if not lazy else self._parse_inline_lazy
         for node in root.child_nodes:
             if ((node.node_name != "dir" or not(not node.name or
                     str(node.name.code).rstrip() in {"code-block", "math"})) and
                     node.node_name not in {"comment", "doctest"}):
 
                 if node.node_name in {"sect", "field"} and node.name:
-                    node.name = self.parse_inline(node.name)
+                    node.name = parse_inline(node.name)
 
                 if node.head:
                     if not node.head.child_nodes.is_empty():
-                        self.parse_node_inline(node.head)
+                        self.parse_node_inline(node.head, lazy)
                     else:
-                        node.head = self.parse_inline(node.head)
+                        node.head = parse_inline(node.head)
 
                 if node.body:
                     if not node.body.child_nodes.is_empty():
-                        self.parse_node_inline(node.body)
+                        self.parse_node_inline(node.body, lazy)
                     else:
-                        node.body = self.parse_inline(node.body)
+                        node.body = parse_inline(node.body)
 
         return root
 
 
+    def _parse_inline_lazy(self, node):
+        """Parse the inline markup of the part on first access of its child nodes."""
+        node.child_nodes = LazyLinkedList(node, partial(self.parse_inline, node))
+        return node
+
+
     def _map_parts(self, node, code, match_obj, part_names, open_end=False):
         """Map the match groups to node parts."""
         index_last = 0
@@ -1062,8 +1309,19 @@ def cell(active, line):
 
     # -- Inline --------------------------------------------------------------
 
+    def _is_inline_candidate(self, name, code_str):
+        """Check if the text contains the substrings required by the inline type."""
+        for needle in self._inline_needles[name]:
+            if needle in code_str:
+                return True
+        return False
+
+
     def inline(self, node, code, name):
-        if m := re.search(self.re_lib[name][0], str(code)):
+        code_str = str(code)
+        if not self._is_inline_candidate(name, code_str):
+            node.active = node.active.next
+        elif m := self.re_lib[name][0].search(code_str):
             before, inner, after = node.active.body.code.slice_match(m, 0, plenary=True)
             node.active.body.code = before
             node.active.code = before
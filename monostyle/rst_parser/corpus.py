@@ -0,0 +1,190 @@
+
+"""
+rst_parser.corpus
+~~~~~~~~~~~~~~~~~
+
+Shared pass over the RST files of the project.
+"""
+
+import os
+import hashlib
+import pickle
+
+import monostyle.util.monostyle_io as monostyle_io
+from monostyle.rst_parser.core import RSTParser
+from monostyle.rst_parser.cache import parser_version
+from monostyle.util.profiler import Profiler
+
+
+def visitor_version():
+    """Return a hash of the parser and all modules and data files of the package.
+    The visitors can reach any of them e.g. the walker, the segmenter or the data files.
+    """
+    if visitor_version.value is None:
+        hasher = hashlib.sha1(parser_version().encode("utf-8"))
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        filenames = []
+        for root, dirs, files in os.walk(base_dir):
+            dirs[:] = sorted(dirname for dirname in dirs if dirname != "__pycache__")
+            filenames.extend(os.path.join(root, filename) for filename in sorted(files)
+                             if filename.endswith((".py", ".json")))
+
+        for filename in filenames:
+            hasher.update(monostyle_io.norm_path_sep(os.path.relpath(filename, base_dir))
+                          .encode("utf-8"))
+            try:
+                with open(filename, "rb") as module_file:
+                    hasher.update(module_file.read())
+            except (IOError, OSError):
+                pass
+
+        visitor_version.value = hasher.hexdigest()[:16]
+    return visitor_version.value
+
+visitor_version.value = None
+
+
+class Corpus:
+    """Parses each RST file once and feeds the document to the registered visitors.
+
+    The visitors return the contribution of the file, the finish function
+    receives the contributions of all files in the order of the files.
+    The visitors must not alter the document because it is shared.
+
+    With a cache the contributions are stored in the index file of the cache folder.
+    Only the files which have been changed since the last pass are parsed.
+    """
+
+    index_name = "corpus.index"
+
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance = super().__new__(cls)
+            cls.instance.visitors = []
+        return cls.instance
+
+
+    def register(self, name, visitor, finish=None, path=None):
+        """Add a visitor to the next pass.
+        name -- unique name of the visitor, key of its stored contributions.
+        visitor -- called with each document, returns the contribution.
+        finish -- called after the pass with a dict of filenames and contributions.
+        path -- restrict the visitor to the files within the directory.
+        """
+        if path is not None:
+            path = monostyle_io.norm_path_sep(path).rstrip('/') + '/'
+        self.visitors.append((name, visitor, finish, path))
+
+
+    def run(self, cache=None):
+        """Parse the files and apply the registered visitors.
+        cache -- parse cache passed to the parser and location of the index.
+        """
+        if not self.visitors:
+            return
+
+        visitors = self.visitors
+        self.visitors = []
+        index_filename = (os.path.join(cache.directory, self.index_name)
+                          if cache else None)
+        index = self.read_index(index_filename)
+        is_changed = False
+
+        stores = []
+        index_prev = index.copy()
+        for name, visitor, _, __ in visitors:
+            version = visitor_version()
+            if name in index_prev.keys() and index_prev[name][0] == version:
+                stored = index_prev[name][1]
+            else:
+                stored = {}
+            store = {}
+            index[name] = (version, store)
+            stores.append((stored, store))
+
+        profiler = Profiler()
+        rst_parser = RSTParser(cache)
+        filenames = list(monostyle_io.doc_files())
+        for counter, filename in enumerate(filenames):
+            visitors_file = tuple(index_visitor
+                                  for index_visitor, (_, __, ___, path) in enumerate(visitors)
+                                  if path is None or filename.startswith(path))
+            if not visitors_file:
+                continue
+
+            try:
+                stat = os.stat(filename)
+                stat = (stat.st_mtime_ns, stat.st_size)
+            except (IOError, OSError):
+                stat = None
+
+            text = None
+            digest = None
+            document = None
+            for index_visitor in visitors_file:
+                stored, store = stores[index_visitor]
+                entry = stored.get(filename)
+                if entry is None or stat is None or entry[0] != stat:
+                    if text is None:
+                        monostyle_io.print_over("read rst-files: [{:4.0%}]"
+                                                .format(counter / len(filenames)), is_temp=True)
+                        filename_doc, text = monostyle_io.single_text(filename)
+                        if text is None:
+                            break
+                        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+                    is_changed = True
+                    if entry is None or entry[1] != digest:
+                        if document is None:
+                            time_start = profiler.clock()
+                            document = rst_parser.parse(rst_parser.document(filename_doc, text))
+                            profiler.add("corpus-parse", "", time_start, len(text))
+                        time_start = profiler.clock()
+                        entry = (stat, digest, visitors[index_visitor][1](document))
+                        profiler.add("corpus", visitors[index_visitor][0], time_start, len(text))
+                    else:
+                        entry = (stat, digest, entry[2])
+
+                store[filename] = entry
+
+        for (name, _, finish, __), (stored, store) in zip(visitors, stores):
+            if len(stored) != len(store):
+                is_changed = True
+            if finish is not None:
+                time_start = profiler.clock()
+                finish({filename: entry[2] for filename, entry in store.items()})
+                profiler.add("corpus-finish", name, time_start)
+
+        if is_changed:
+            self.write_index(index_filename, index)
+
+
+    def read_index(self, filename):
+        """Return the stored contributions of the visitors."""
+        if filename is None:
+            return {}
+        try:
+            with open(filename, "rb") as index_file:
+                return pickle.load(index_file)
+        except (IOError, OSError):
+            return {}
+        except (pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+            print("{0}: cannot read corpus index".format(filename))
+            return {}
+
+
+    def write_index(self, filename, index):
+        """Store the contributions of the visitors."""
+        if filename is None:
+            return
+        filename_temp = filename + ".{0}.tmp".format(os.getpid())
+        try:
+            with open(filename_temp, "wb") as index_file:
+                pickle.dump(index, index_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(filename_temp, filename)
+        except (IOError, OSError, pickle.PicklingError) as err:
+            print("{0}: cannot write corpus index: {1}".format(filename, err))
+            try:
+                os.remove(filename_temp)
+            except (IOError, OSError):
+                pass
@@ -8,42 +8,60 @@
 
 import monostyle.util.monostyle_io as monostyle_io
 import monostyle.rst_parser.walker as rst_walker
+from monostyle.rst_parser.rst_node import NodePartRST
+from monostyle.rst_parser.corpus import Corpus
 
 
 def get_link_titles(rst_parser):
     """Get titles."""
-    def detach(node, child):
-        node.child_nodes.remove(child)
-        child.detach()
-        return child
+    titles, targets = collect_link_titles()
+    Corpus().run(rst_parser.cache)
+    return titles, targets
+
 
+def collect_link_titles():
+    """Register the collection of the titles in the corpus pass.
+    The returned dicts are filled by the pass.
+    """
     targets = {}
     titles = {}
 
-    for filename, text in monostyle_io.doc_texts():
-        doc = rst_parser.document(filename, text)
-        doc.body = rst_parser.parse_block(doc.body)
-        for node in rst_walker.iter_node(doc.body, "sect"):
-            filename = monostyle_io.path_to_rel(filename, "doc")
-            filename = '/' + filename[:-4]
-
-            titles[filename] = detach(node, node.name)
-            break
-
-        for node in rst_walker.iter_node(doc.body, "target"):
+    def visit(document):
+        title = None
+        for node in document.body.child_nodes:
+            if node.node_name == "sect":
+                title = (node.name.node_name, node.name.code)
+                break
+
+        targets_file = []
+        for node in document.body.child_nodes:
+            if node.node_name != "target":
+                continue
             node_next = node.next
             while node_next:
                 if (rst_walker.is_annotation(node_next) or
                         rst_walker.is_blank_text(node_next)):
                     node_next = node_next.next
                 else:
-                    if node_next.node_name == "sect":
-                        targeted = detach(node_next, node_next.name)
-                    else:
-                        targeted = detach(node_next, node_next.body)
-                    targets[str(node.id.code).strip()] = targeted
+                    targeted = node_next.name if node_next.node_name == "sect" else node_next.body
+                    if targeted is not None:
+                        targets_file.append((str(node.id.code).strip(),
+                                             (targeted.node_name, targeted.code)))
                     break
 
+        return title, targets_file
+
+    def finish(contributions):
+        for filename, (title, targets_file) in contributions.items():
+            if title is not None:
+                filename = monostyle_io.path_to_rel(filename, "doc")
+                filename = '/' + filename[:-4]
+                titles[filename] = NodePartRST(*title)
+
+            for id_str, targeted in targets_file:
+                targets[id_str] = NodePartRST(*targeted)
+
+    Corpus().register("link-titles", visit, finish)
     return titles, targets
 
 
@@ -9,6 +9,112 @@
 from monostyle.rst_parser.rst_node import NodeRST
 
 
+class NodeIndex:
+    """Nodes of a tree in document order grouped by node_name."""
+
+    __slots__ = ('nodes', 'ends', 'positions', 'positions_named')
+
+
+    def __init__(self, root):
+        """
+        root -- part the index is built for.
+        """
+        self.nodes = []
+        # end of the subtree
+        self.ends = []
+        self.positions = {}
+        self.positions_named = {}
+
+        self._add(root)
+
+
+    def _add(self, root):
+        for node in root.child_nodes:
+            pos = len(self.nodes)
+            self.nodes.append(node)
+            self.ends.append(None)
+            self.positions.setdefault(node.node_name, []).append(pos)
+            for part in node.child_nodes:
+                if not part.child_nodes.is_empty():
+                    self._add(part)
+            self.ends[pos] = len(self.nodes)
+
+
+    def iter_node(self, names, enter_pos=True, leafs_only=False):
+        """Iterate over nodes with a node_name in names."""
+        if len(names) == 1:
+            positions = self.positions.get(next(iter(names)), ())
+        else:
+            positions = sorted(pos for name in names for pos in self.positions.get(name, ()))
+
+        end = 0
+        for pos in positions:
+            if pos < end:
+                continue
+            if not enter_pos:
+                end = self.ends[pos]
+            node = self.nodes[pos]
+            if leafs_only:
+                for part in node.child_nodes:
+                    if not part.child_nodes.is_empty():
+                        break
+                else:
+                    yield node
+            else:
+                yield node
+
+
+    def iter_node_named(self, node_name, name_rule):
+        """Iterate over nodes with the node_name and a name matching the rule."""
+        if (named := self.positions_named.get(node_name)) is None:
+            named = {}
+            for pos in self.positions.get(node_name, ()):
+                node = self.nodes[pos]
+                name = str(node.name.code).strip() if node.name is not None else "default"
+                named.setdefault(name, []).append(pos)
+            self.positions_named[node_name] = named
+
+        if isinstance(name_rule, str):
+            name_rule = {name_rule,}
+        if "*" in name_rule:
+            positions = self.positions.get(node_name, ())
+        else:
+            positions = sorted(pos for name in name_rule for pos in named.get(name, ()))
+        for pos in positions:
+            yield self.nodes[pos]
+
+
+_indexes = {}
+
+
+def index_document(document):
+    """Let the walkers use a node index and share the filtered parts for the document body.
+    The index is built on first use, the tree must not change until unindexed.
+    """
+    _indexes[id(document.body)] = [document.body, None, {}]
+
+
+def unindex_document(document):
+    """Remove the node index of the document."""
+    _indexes.pop(id(document.body), None)
+
+
+def get_memo(root):
+    """Return the memo dict of the root if it is an indexed document body."""
+    if (entry := _indexes.get(id(root))) is None or entry[0] is not root:
+        return None
+    return entry[2]
+
+
+def get_index(root):
+    """Return the node index of the root if it is an indexed document body."""
+    if (entry := _indexes.get(id(root))) is None or entry[0] is not root:
+        return None
+    if entry[1] is None:
+        entry[1] = NodeIndex(root)
+    return entry[1]
+
+
 def iter_node(root, names=None, enter_pos=True, leafs_only=False, output_root=False):
     """Iterate over nodes.
     names -- node.node_name must positive match.
@@ -19,6 +125,10 @@ def iter_node(root, names=None, enter_pos=True, leafs_only=False, output_root=Fa
     if isinstance(names, str):
         names = {names,}
 
+    if names and not output_root and (index := get_index(root)) is not None:
+        yield from index.iter_node(names, enter_pos, leafs_only)
+        return
+
     if isinstance(root, NodeRST):
         if output_root:
             yield root
@@ -45,6 +155,20 @@ def iter_node(root, names=None, enter_pos=True, leafs_only=False, output_root=Fa
                         yield from iter_node(part, names, enter_pos, leafs_only)
 
 
+def iter_node_named(root, node_name, name_rule):
+    """Iterate over nodes with a matching node_name and name like a directive or role name.
+    name_rule -- name or names, asterisk wildcard matches all,
+                 default matches None thus for default directives or roles.
+    """
+    if (index := get_index(root)) is not None:
+        yield from index.iter_node_named(node_name, name_rule)
+        return
+
+    for node in iter_node(root, node_name):
+        if is_of(node, "*", name_rule):
+            yield node
+
+
 def iter_nodeparts(root, names=None, enter_pos=True, leafs_only=True, output_root=False):
     """Iterate over node parts.
     names -- part.node_name must positive match.
@@ -74,39 +198,71 @@ def iter_nodeparts(root, names=None, enter_pos=True, leafs_only=True, output_roo
                 yield from iter_nodeparts(part, names, enter_pos, leafs_only)
 
 
+def compile_instr(instr):
+    """Compile an instruction into nested lookup tables.
+    Returns a bool or a tuple of the table and the wildcard value.
+    """
+    if instr is True or instr is False:
+        return instr
+    if not instr:
+        return False
+
+    if isinstance(instr, dict):
+        table = {name: compile_instr(value) for name, value in instr.items()}
+    else:
+        if isinstance(instr, str):
+            instr = (instr,)
+        table = {name: True for name in instr}
+
+    return (table, table.get("*", False))
+
+
+def _freeze_instr(instr):
+    """Convert the instruction to a hashable key."""
+    if isinstance(instr, dict):
+        return tuple(sorted(((name, _freeze_instr(value)) for name, value in instr.items()),
+                            key=lambda entry: entry[0]))
+    if isinstance(instr, (list, tuple, set)):
+        return frozenset(instr)
+    return instr
+
+
+_instr_compiled = {}
+
+
 def iter_nodeparts_instr(root, instr_pos, instr_neg, leafs_only=True, output_root=False):
     """Iterate over node parts.
     instruction format: node.node_name, node.name, part.node_name
     asterisk wildcards matches all or None
     default matches None for default directives or roles
     """
-    def rules(name, instr):
-        if instr is True or instr is False:
-            return instr
+    key = (_freeze_instr(instr_pos), _freeze_instr(instr_neg))
+    if (compiled := _instr_compiled.get(key)) is None:
+        compiled = (compile_instr(instr_pos), compile_instr(instr_neg))
+        _instr_compiled[key] = compiled
 
-        is_dict = bool(isinstance(instr, dict))
-        if is_dict:
-            keys = set(instr.keys())
-        elif isinstance(instr, str):
-            keys = {instr,}
-        else:
-            keys = instr
+    if (memo := get_memo(root)) is not None:
+        # the tools with the same filter share the parts
+        key += (leafs_only, output_root)
+        if (parts := memo.get(key)) is None:
+            parts = list(_iter_nodeparts_compiled(root, *compiled, leafs_only, output_root))
+            memo[key] = parts
+        yield from parts
+        return
+
+    yield from _iter_nodeparts_compiled(root, *compiled, leafs_only, output_root)
 
-        if name is None:
-            name = "default"
-        if name not in keys:
-            if "*" in keys:
-                name = "*"
-            else:
-                return False
 
-        if is_dict:
-            return instr[name]
-        return True
+def _iter_nodeparts_compiled(root, instr_pos, instr_neg, leafs_only, output_root=False):
+    """Iterate over node parts with compiled instructions."""
+    def rules(name, instr):
+        if instr is True or instr is False:
+            return instr
+        return instr[0].get(name if name is not None else "default", instr[1])
 
     if isinstance(root, NodeRST):
         for node in root.child_nodes:
-            yield from iter_nodeparts_instr(node, instr_pos, instr_neg, leafs_only)
+            yield from _iter_nodeparts_compiled(node, instr_pos, instr_neg, leafs_only)
     else:
         if output_root:
             yield root
@@ -133,7 +289,8 @@ def rules(name, instr):
                         if not leafs_only:
                             yield part
 
-                        yield from iter_nodeparts_instr(part, instr_pos, instr_neg, leafs_only)
+                        yield from _iter_nodeparts_compiled(part, instr_pos, instr_neg,
+                                                            leafs_only)
 
                     else:
                         yield part
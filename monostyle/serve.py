@@ -0,0 +1,324 @@
+
+"""
+serve
+~~~~~
+
+Resident process which keeps the tools initialized
+and applies them on the requests of a thin client sent over a local socket.
+"""
+
+import sys
+import os
+import json
+import codecs
+import socket
+
+socket_name = "serve.sock"
+
+
+def socket_path_default(root=None):
+    """Return the socket location in the user config folder."""
+    if not root:
+        root = os.getcwd()
+    return os.path.normpath(os.path.join(root, "monostyle", socket_name))
+
+
+def serve(socket_path, use_cache=True):
+    """Initialize the tools and process requests until stopped."""
+    import monostyle.__main__ as main_mod
+    from monostyle.rst_parser.core import RSTParser
+    from monostyle.rst_parser.cache import ParseCache
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("serve: local sockets are not supported on this platform")
+        return 2
+
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # left over from a server which has not stopped cleanly
+            try:
+                os.remove(socket_path)
+            except FileNotFoundError:
+                pass
+            except (IOError, OSError) as err:
+                print("{0}: cannot remove: {1}".format(socket_path, err))
+                return 2
+        except (IOError, OSError) as err:
+            print("{0}: cannot connect: {1}".format(socket_path, err))
+            return 2
+        else:
+            print("{0}: a server is already running".format(socket_path))
+            return 2
+        finally:
+            probe.close()
+
+    parse_cache = ParseCache() if use_cache else None
+    state = {
+        "mods": main_mod.init_tools(cache=parse_cache),
+        "rst_parser": RSTParser(parse_cache),
+        "vsn_inter": getattr(main_mod, "vsn_inter", None)
+    }
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(socket_path)
+        server.listen()
+        print("serving on", socket_path)
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                if not handle(conn, state, parse_cache):
+                    break
+
+    except (IOError, OSError) as err:
+        print("{0}: cannot serve: {1}".format(socket_path, err))
+        return 2
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            os.remove(socket_path)
+        except (IOError, OSError):
+            pass
+
+    print("stopped serving")
+    return 0
+
+
+def handle(conn, state, parse_cache):
+    """Process a single request with the output redirected to the client.
+    Returns False if the server should stop.
+    """
+    import traceback
+    from contextlib import redirect_stdout
+
+    try:
+        with conn.makefile("r", encoding="utf-8") as stream_in:
+            request = json.loads(stream_in.readline())
+    except (IOError, OSError, ValueError) as err:
+        print("serve: invalid request: {0}".format(err))
+        return True
+
+    try:
+        with conn.makefile("w", encoding="utf-8") as stream_out:
+            with redirect_stdout(stream_out):
+                try:
+                    command = request.get("command", "lint")
+                    if command == "stop":
+                        print("stopped serving")
+                        return False
+                    if command == "reload":
+                        reload(state, parse_cache)
+                        print("reloaded tools")
+                    else:
+                        lint(state, request)
+                except Exception:
+                    # keep serving
+                    traceback.print_exc(file=sys.stdout)
+
+    except (IOError, OSError) as err:
+        print("serve: cannot respond: {0}".format(err))
+
+    return True
+
+
+def reload(state, parse_cache):
+    """Reinitialize the tools to update the project wide data."""
+    import monostyle.__main__ as main_mod
+    from monostyle.util.lexicon import Lexicon
+
+    Lexicon.__default__ = {}
+    main_mod.init.lexicon_exist = None
+    state["mods"] = main_mod.init_tools(cache=parse_cache)
+
+
+def lint(state, request):
+    """Apply the tools on a file, a patch or the changes to the working copy."""
+    import tempfile
+    import monostyle.__main__ as main_mod
+    import monostyle.util.monostyle_io as monostyle_io
+
+    parse_options = {"parse": True, "resolve": bool(request.get("resolve")), "post": False}
+    version_options = None
+    path = None
+    filename_temp = None
+    if "patch" in request.keys():
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".diff",
+                                         delete=False) as patch_file:
+            patch_file.write(request["patch"])
+            filename_temp = patch_file.name
+
+        is_git = main_mod.patch_flavor(filename_temp)
+        if is_git is None:
+            os.remove(filename_temp)
+            print("error: unknown patch format")
+            return
+        main_mod.vsn_inter = main_mod.import_module("git_inter" if is_git else "svn_inter",
+                                                    "vsn_inter")
+        path = filename_temp
+        version_options = {"from_vsn": False, "is_internal": True, "rev": None,
+                           "cached": False, "unversioned": False}
+
+    elif "file" in request.keys():
+        path = request["file"]
+        if path:
+            path = monostyle_io.norm_path_sep(path)
+
+    else:
+        if state["vsn_inter"] is None:
+            print("error: directory is not a repository")
+            return
+        main_mod.vsn_inter = state["vsn_inter"]
+        is_internal = bool(request.get("external") is None)
+        rev = request.get("internal" if is_internal else "external")
+        version_options = {"from_vsn": True,
+                           "is_internal": is_internal,
+                           "rev": rev.strip() if rev else None,
+                           "cached": bool(request.get("cached")),
+                           "unversioned": bool(request.get("unversioned"))}
+
+    if version_options:
+        parse_options["post"] = True
+
+    try:
+        main_mod.apply(state["mods"], path, state["rst_parser"], parse_options, version_options)
+    finally:
+        state["rst_parser"].warnings = []
+        if filename_temp:
+            os.remove(filename_temp)
+
+
+def send(socket_path, request):
+    """Send a request to the server and print the response."""
+    if not hasattr(socket, "AF_UNIX"):
+        print("client: local sockets are not supported on this platform")
+        return 2
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except (IOError, OSError) as err:
+            print("{0}: cannot connect to server: {1}".format(socket_path, err))
+            return 2
+
+        client.sendall((json.dumps(request) + '\n').encode("utf-8"))
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        while data := client.recv(4096):
+            sys.stdout.write(decoder.decode(data))
+            sys.stdout.flush()
+
+    return 0
+
+
+def main_serve(argv=None):
+    import argparse
+    from monostyle.__main__ import setup
+    import monostyle.config as config
+
+    descr = "Keep the tools initialized and process the requests of the client."
+    parser = argparse.ArgumentParser(prog="monostyle serve", description=descr)
+    parser.add_argument("-r", "--root",
+                        dest="root", nargs='?', const="",
+                        help="defines the ROOT directory of the project")
+    parser.add_argument("--socket",
+                        dest="socket_path",
+                        help="listen on SOCKET_PATH instead of in the user config folder")
+    parser.add_argument("--no-cache",
+                        action="store_true", dest="no_cache", default=False,
+                        help="parse all documents instead of loading unchanged ones from the cache")
+
+    args = parser.parse_args(argv)
+
+    setup_sucess, _ = setup(args.root)
+    if not setup_sucess:
+        return 2
+    # no autofix through the client
+    if "console_options" in vars(config).keys():
+        config.console_options["show_autofix"] = False
+
+    socket_path = args.socket_path
+    if not socket_path:
+        socket_path = socket_path_default(os.getcwd())
+    return serve(socket_path, not args.no_cache)
+
+
+def main_client(argv=None):
+    import argparse
+
+    descr = "Send a request to the server and print the reports."
+    parser = argparse.ArgumentParser(prog="monostyle client", description=descr)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("-i", "--internal",
+                       dest="internal", nargs='?', const="", metavar="REV",
+                       help="check changes to the working copy (against REV)")
+    group.add_argument("-e", "--external",
+                       dest="external", nargs='?', const="", metavar="REV",
+                       help="check changes to the repository (at REV)")
+    group.add_argument("-p", "--patch",
+                       dest="patch", help="read diff from PATCHFILE, '-' for stdin")
+    group.add_argument("-f", "--file",
+                       dest="filename", nargs='?', const="",
+                       help="check working copy file or directory FILENAME")
+    group.add_argument("--reload",
+                       action="store_true", dest="reload", default=False,
+                       help="reinitialize the tools of the server")
+    group.add_argument("--stop",
+                       action="store_true", dest="stop", default=False,
+                       help="stop the server")
+
+    parser.add_argument("-r", "--root",
+                        dest="root", nargs='?', const="",
+                        help="defines the ROOT directory of the project")
+    parser.add_argument("--socket",
+                        dest="socket_path",
+                        help="connect to SOCKET_PATH instead of in the user config folder")
+    parser.add_argument("--cached", "--staged",
+                        action="store_true", dest="cached", default=False,
+                        help="set diff cached option (Git only)")
+    parser.add_argument("--unversioned", "--untracked",
+                        action="store_true", dest="unversioned", default=False,
+                        help="include unversioned files")
+    parser.add_argument("-s", "--resolve",
+                        action="store_true", dest="do_resolve", default=False,
+                        help="resolve link titles and substitutions")
+
+    args = parser.parse_args(argv)
+
+    if args.stop:
+        request = {"command": "stop"}
+    elif args.reload:
+        request = {"command": "reload"}
+    else:
+        request = {"command": "lint", "resolve": args.do_resolve}
+        if args.patch is not None:
+            try:
+                if args.patch == '-':
+                    request["patch"] = sys.stdin.read()
+                else:
+                    with open(args.patch, "r", encoding="utf-8") as patch_file:
+                        request["patch"] = patch_file.read()
+            except (IOError, OSError) as err:
+                print("{0}: cannot read: {1}".format(args.patch, err))
+                return 2
+        elif args.filename is not None:
+            request["file"] = args.filename
+        else:
+            request["internal"] = args.internal
+            request["external"] = args.external
+            request["cached"] = args.cached
+            request["unversioned"] = args.unversioned
+
+    socket_path = args.socket_path
+    if not socket_path:
+        socket_path = socket_path_default(args.root)
+    return send(socket_path, request)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "client":
+        sys.exit(main_client(sys.argv[2:]))
+    sys.exit(main_serve())
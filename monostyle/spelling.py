@@ -14,6 +14,7 @@
 
 import monostyle.rst_parser.walker as rst_walker
 from monostyle.util.segmenter import Segmenter
+from monostyle.util.token_table import get_token_table
 from monostyle.util.lexicon import Lexicon
 
 
@@ -64,9 +65,12 @@ def search(toolname, document, reports, config):
     return reports
 
 
-def word_filtered(document):
-    """Iterate over words in the filtered text."""
+def word_filtered(document, lazy=False):
+    """Iterate over words in the filtered text.
+    lazy -- yield Tokens instead of Fragments.
+    """
     segmenter = Segmenter()
+    memo = rst_walker.get_memo(document.body)
     dev_re = re.compile(r"^(rBM|t)\d+?$", re.IGNORECASE)
 
     instr_pos = {
@@ -99,7 +103,11 @@ def word_filtered(document):
                     re.match(r"Author(?:[\(/]?s\)?)?", str(par_node.name.code)))):
             continue
 
-        for word in segmenter.iter_word(part.code):
+        if lazy:
+            words = segmenter.iter_word(part.code, lazy=True)
+        else:
+            words = get_token_table(memo, part.code).words()
+        for word in words:
             if len(word) < 2:
                 continue
             if re.search(dev_re, str(word)):
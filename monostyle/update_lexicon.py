@@ -9,34 +9,49 @@
 import csv
 
 import monostyle.util.monostyle_io as monostyle_io
-from monostyle.rst_parser.core import RSTParser
+from monostyle.rst_parser.cache import ParseCache
+from monostyle.rst_parser.corpus import Corpus
 from monostyle.spelling import word_filtered
 
 from monostyle.util.lexicon import Lexicon
+from monostyle.util.stemmer import Stemmer, stemmer_version
 
 
-def setup_lexicon():
-    """Build and save the lexicon."""
+def setup_lexicon(cache=None):
+    """Build and save the lexicon.
+    cache -- parse cache used by the corpus pass.
+    """
     lexicon = Lexicon(False)
     if not lexicon:
         if monostyle_io.ask_user("The lexicon does not exist in the user config folder ",
                                  "do you want to build it"):
-            lexicon_write_csv(build_lexicon())
+            lexicon_write_csv(build_lexicon(cache))
         else:
             return False
 
     return True
 
 
-def build_lexicon():
-    """Build lexicon by looping over files."""
-    rst_parser = RSTParser()
+def build_lexicon(cache=None):
+    """Build lexicon by looping over files.
+    cache -- parse cache used by the corpus pass.
+    """
     lexicon = Lexicon()
-    for filename, text in monostyle_io.doc_texts():
-        document = rst_parser.parse(rst_parser.document(filename, text))
-        for word in word_filtered(document):
-            lexicon.add(str(word))
 
+    def visit(document):
+        words = dict()
+        for word in word_filtered(document, lazy=True):
+            word_str = str(word)
+            words[word_str] = words.get(word_str, 0) + 1
+        return words
+
+    def finish(contributions):
+        for words in contributions.values():
+            for word_str, count in words.items():
+                lexicon.add(word_str, count=count)
+
+    Corpus().register("lexicon", visit, finish)
+    Corpus().run(cache)
     return lexicon
 
 
@@ -56,6 +71,25 @@ def lexicon_write_csv(lexicon):
     except (IOError, OSError) as err:
         print("{0}: cannot write: {1}".format(lex_filename, err))
 
+    stems_write_csv(lexicon)
+
+
+def stems_write_csv(lexicon):
+    """Write the stems of the lexicon words to user config directory."""
+    stems_filename = monostyle_io.path_to_abs("monostyle/stems.csv")
+    porter_stemmer = Stemmer().porter_stemmer
+    words = sorted({entry[0].lower() for entry in lexicon.join()})
+    try:
+        with open(stems_filename, 'w', newline='', encoding='utf-8') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow((stemmer_version(),))
+            for word_str in words:
+                csv_writer.writerow((word_str,
+                                     porter_stemmer.stem(word_str, 0, len(word_str) - 1)))
+
+    except (IOError, OSError) as err:
+        print("{0}: cannot write: {1}".format(stems_filename, err))
+
 
 def differential(lex_stored, lex_new):
     """Show a differential between the current texts and the stored lexicon."""
@@ -85,13 +119,17 @@ def main():
                         dest="root", nargs='?', const="",
                         help="defines the ROOT directory of the project")
 
+    parser.add_argument("--no-cache",
+                        action="store_true", dest="no_cache", default=False,
+                        help="parse all documents instead of loading unchanged ones from the cache")
+
     args = parser.parse_args()
 
     setup_sucess = setup(args.root)
     if not setup_sucess:
         return 2
 
-    lexicon_new = build_lexicon()
+    lexicon_new = build_lexicon(ParseCache() if not args.no_cache else None)
     if not args.diff:
         lexicon_write_csv(lexicon_new)
     else:
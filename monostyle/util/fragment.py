@@ -6,13 +6,58 @@
 Text line container.
 """
 
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+
+class SourceBuffer():
+    """An immutable text shared by the Fragments viewing it."""
+
+    __slots__ = ('text', '_line_starts')
+
+
+    def __init__(self, text):
+        self.text = text
+        self._line_starts = None
+
+
+    def __getstate__(self):
+        return None, {"text": self.text}
+
+
+    def __setstate__(self, state):
+        self.text = state[1]["text"]
+        self._line_starts = None
+
+
+    def line_starts(self):
+        """Return the char offsets of the line starts and the text length."""
+        if self._line_starts is None:
+            self._line_starts = list(accumulate(map(len, self.text.splitlines(keepends=True)),
+                                                initial=0))
+        return self._line_starts
+
+
+    def line_span(self, start, end):
+        """Return the index range of the line starts within the span (excluding its start)."""
+        line_starts = self.line_starts()
+        return bisect_right(line_starts, start), bisect_left(line_starts, end)
+
+
 class Fragment():
     """A substring with positional information.
     Well formed if: A single string per line including a single newline at the end,
     The end is after or equals start.
+
+    A Fragment created from a string is a view on a buffer shared with its slices and copies
+    (source, start offset, end offset, whether a zero length line is at the end).
+    The content list is only built when it is accessed.
+    The joined text of a content list is cached,
+    thus the content list must not be altered in place from outside.
     """
 
-    __slots__ = ('filename', 'content', 'start_pos', 'end_pos', 'start_lincol', 'end_lincol')
+    __slots__ = ('filename', '_content', 'start_pos', 'end_pos', 'start_lincol', 'end_lincol',
+                 '_offsets', '_view', '_text')
 
 
     def __init__(self, filename, content, start_pos=None, end_pos=None,
@@ -30,13 +75,16 @@ def __init__(self, filename, content, start_pos=None, end_pos=None,
         self.filename = filename
 
         if content is None:
-            content = []
+            self._content = []
+            self._view = None
         elif isinstance(content, str):
-            content = list(content.splitlines(keepends=True))
+            self._content = None
+            self._view = (SourceBuffer(content), 0, len(content), False)
         else:
-            content = content.copy()
-
-        self.content = content
+            self._content = content.copy()
+            self._view = None
+        self._offsets = None
+        self._text = None
 
         start_pos = int(start_pos) if start_pos is not None else 0
         end_pos = int(end_pos) if end_pos is not None else None
@@ -57,6 +105,22 @@ def __init__(self, filename, content, start_pos=None, end_pos=None,
             self.correlate_len(pos_lincol=pos_lincol, start_end=False)
 
 
+    def __getstate__(self):
+        """Leave out the line offsets and the shared buffer."""
+        state = {prop: getattr(self, prop) for prop in Fragment.__slots__
+                 if prop not in {'_content', '_offsets', '_view', '_text'}}
+        state['content'] = self.content if self._view is None else self._view_lines()
+        return None, state
+
+
+    def __setstate__(self, state):
+        self._view = None
+        for prop, value in state[1].items():
+            setattr(self, prop, value)
+        self._offsets = None
+        self._text = None
+
+
     def get_start(self, pos_lincol=True):
         return self.start_pos if pos_lincol else self.start_lincol
 
@@ -97,6 +161,119 @@ def set_end(self, loc, lincol=None):
     end = property(get_end, set_end)
 
 
+    def get_content(self):
+        """Build the content list of a view (which then is no longer a view)."""
+        if self._view is not None:
+            content = self._view_lines()
+            offsets = self._offsets
+            self._content = content
+            self._view = None
+            self._offsets = (content, offsets[1]) if offsets is not None else None
+            self._text = None
+        return self._content
+
+    def set_content(self, value):
+        self._content = value
+        self._view = None
+        self._offsets = None
+        self._text = None
+
+    content = property(get_content, set_content)
+
+
+    def _view_lines(self):
+        """Split the viewed text into lines."""
+        source, start, end, is_zero_end = self._view
+        lines = source.text[start:end].splitlines(keepends=True)
+        if is_zero_end:
+            lines.append('')
+        return lines
+
+
+    def _new_view(self, view, start_pos, start_lincol, line_count, last_len):
+        """Returns a Fragment on the view with the end derived from the length,
+        the count of lines and the length of the last line.
+        """
+        if start_lincol is None:
+            start_lincol = (0, 0)
+        end_pos = start_pos + view[2] - view[1]
+        if line_count == 0:
+            end_lincol = start_lincol
+        elif line_count == 1:
+            end_lincol = (start_lincol[0], start_lincol[1] + last_len)
+        else:
+            end_lincol = (start_lincol[0] + line_count - 1, last_len)
+
+        new = Fragment.__new__(Fragment)
+        new.filename = self.filename
+        new._content = None
+        if view[1] == start_pos and view[2] == end_pos:
+            # share the numbers
+            view = (view[0], start_pos, end_pos, view[3])
+        new._view = view
+        new._offsets = None
+        new._text = None
+        new.start_pos = start_pos
+        new.end_pos = end_pos
+        new.start_lincol = start_lincol
+        new.end_lincol = end_lincol
+        return new
+
+
+    def view(self, start_pos, end_pos, start_lincol=None, end_lincol=None):
+        """Returns a Fragment of the span without copying the text.
+        The span (absolute char positions) has to be within the content.
+        """
+        start = start_pos - self.start_pos
+        end = end_pos - self.start_pos
+        if self._view is None or self._view[3]:
+            return Fragment(self.filename, str(self)[start:end], start_pos, end_pos,
+                            start_lincol, end_lincol, bool(start_lincol is not None))
+
+        source, offset = self._view[:2]
+        new = Fragment.__new__(Fragment)
+        new.filename = self.filename
+        new._content = None
+        new._view = (source, offset + start, offset + end, False)
+        new._offsets = None
+        new._text = None
+        new.start_pos = start_pos
+        new.end_pos = end_pos
+        new.start_lincol = start_lincol
+        new.end_lincol = end_lincol
+        if start_lincol is not None and end_lincol is None:
+            new.correlate_len(pos_lincol=False)
+        return new
+
+
+    def _line_dims(self):
+        """Returns the count of lines and the length of the last line."""
+        view = self._view
+        if view is None:
+            content = self._content
+            return len(content), len(content[-1]) if content else 0
+
+        source, start, end, is_zero_end = view
+        if start == end:
+            line_count = 0
+            last_len = 0
+        else:
+            first, last = source.line_span(start, end)
+            line_count = last - first + 1
+            last_len = end - (source.line_starts()[last - 1] if last != first else start)
+        if is_zero_end:
+            return line_count + 1, 0
+        return line_count, last_len
+
+
+    def _is_eol_end(self):
+        """Returns if the last line ends with a newline."""
+        view = self._view
+        if view is None:
+            return bool(self._content and self._content[-1].endswith('\n'))
+        return not view[3] and view[2] != view[1] and view[0].text[view[2] - 1] == '\n'
+
+
     # -- Filename ------------------------------------------------------------
 
     def has_consistent_filenames(self):
@@ -122,6 +299,8 @@ def extend(self, new_content, keep_end=False):
         else:
             self.content[-1] += new_content[0]
             self.content.extend(new_content[1:])
+        self._offsets = None
+        self._text = None
 
         if not keep_end:
             self.end_pos += sum(map(len, new_content))
@@ -138,6 +317,7 @@ def rermove_zero_len_end(self):
         if (len(self.content) != 0 and len(self.content[-1]) == 0 and
                 self.start_lincol and self.start_lincol[1] == 0):
             self.content = self.content[:-1]
+            self._offsets = None
             self.switch_lincol()
         return self
 
@@ -151,7 +331,10 @@ def combine(self, other, check_align=True, pos_lincol=True, keep_end=False, merg
             if check_align and not self.is_aligned(other, pos_lincol):
                 return self
 
-            if pos_lincol or not self.end_lincol or not other.end_lincol:
+            view = self._combine_view(other, pos_lincol, keep_end)
+            if view is not None:
+                self._view = view
+            elif pos_lincol or not self.end_lincol or not other.end_lincol:
                 self.extend(other.content)
             else:
                 if self.end_lincol == other.start_lincol:
@@ -163,6 +346,8 @@ def combine(self, other, check_align=True, pos_lincol=True, keep_end=False, merg
                         self.content.extend(other.content)
                 else:
                     self.content.extend(other.content)
+            self._offsets = None
+            self._text = None
         else:
             return self.to_bundle().combine(other, check_align, pos_lincol, keep_end, merge)
 
@@ -174,6 +359,34 @@ def combine(self, other, check_align=True, pos_lincol=True, keep_end=False, merg
         return self
 
 
+    def _combine_view(self, other, pos_lincol, keep_end):
+        """Returns the view of both joined if they are adjacent on the same buffer
+        and the joined content list would be split the same.
+        """
+        view = self._view
+        other_view = other._view
+        if (view is None or other_view is None or view[0] is not other_view[0] or
+                view[2] != other_view[1] or view[3] or keep_end or
+                (self.end_lincol and not other.end_lincol)):
+            return None
+
+        joined = (view[0], view[1], other_view[2], other_view[3])
+        if view[1] == view[2] or (other_view[1] == other_view[2] and not other_view[3]):
+            return joined
+
+        # the last line is joined with the first if extended and not ending with a newline
+        # or if the lincol locations are equal
+        is_extend = bool(pos_lincol or not self.end_lincol or not other.end_lincol)
+        last_char = view[0].text[view[2] - 1]
+        if last_char == '\n':
+            if is_extend or self.end_lincol != other.start_lincol:
+                return joined
+        elif len((last_char + '.').splitlines()) == 1:
+            if is_extend or self.end_lincol == other.start_lincol:
+                return joined
+        return None
+
+
     def merge_inner(self, **_):
         return self
 
@@ -333,6 +546,7 @@ def symmetric_difference(self, other, pos_lincol):
     def _transfere_attr(self, other):
         for prop in self.__slots__:
             setattr(self, prop, getattr(other, prop))
+        self._offsets = None
 
 
     def union_update(self, *args):
@@ -409,6 +623,65 @@ def slice_match(self, match_obj, group, plenary=False, keep_bounds=True, **_):
                           True, plenary, keep_bounds)
 
 
+    def slice_matches(self, spans, keep_bounds=True, **_):
+        """Slice by spans (relative pos start and end) e.g. of regex match objects.
+        Yields a Fragment for each span or None if the start is negative (group not matched).
+        The content is walked once if the spans are sorted.
+        """
+        if self._view is None or not self.start_lincol:
+            for start, end in spans:
+                yield self.slice(start, end, True, False, keep_bounds) if start >= 0 else None
+            return
+
+        offsets = self.line_offsets()
+        line_count = len(offsets) - 1
+        if self.end_lincol is not None:
+            self_end_rel = self.loc_to_rel(self.end_lincol)
+        else:
+            self_end_rel = self.loc_to_rel(self.pos_to_lincol(self.end_pos, keep_bounds=True))
+        content_end = ((line_count - 1, offsets[-1] - offsets[-2])
+                       if line_count != 0 else (0, 0))
+
+        def to_lincol(pos):
+            """Same as pos_to_lincol continuing from the previous line."""
+            nonlocal index
+            if pos >= offsets[-1]:
+                return content_end
+            if pos < offsets[index]:
+                index = bisect_right(offsets, pos, 0, line_count) - 1
+            else:
+                while offsets[index + 1] <= pos:
+                    index += 1
+            return (index, pos - offsets[index])
+
+        index = 0
+        for start, end in spans:
+            if start < 0 or end < start:
+                yield self.slice(start, end, True, False, keep_bounds) if start >= 0 else None
+                continue
+
+            start_rel = to_lincol(start)
+            end_rel = to_lincol(end)
+            if start_rel <= (0, 0) and end_rel <= (0, 0):
+                yield self.copy().clear(True) if keep_bounds else None
+            elif end_rel >= self_end_rel and start_rel <= (0, 0):
+                yield self.copy()
+            elif start_rel >= self_end_rel:
+                yield self.copy().clear(False) if keep_bounds else None
+            elif start_rel == end_rel and not keep_bounds:
+                yield None
+            else:
+                sliced = self._slice_view(start_rel, end_rel)
+                if sliced is None:
+                    yield self.slice(start, end, True, False, keep_bounds)
+                    continue
+                start_lincol = self.loc_to_abs(start_rel)
+                yield self._new_view(sliced[0], self.start_pos + min(start, offsets[-1]),
+                                     start_lincol if start_lincol > self.start_lincol
+                                     else self.start_lincol,
+                                     sliced[1], sliced[2])
+
+
     def slice(self, start=None, end=None, is_rel=False, plenary=False, keep_bounds=True):
         """Cut span."""
         if start is None:
@@ -475,7 +748,8 @@ def slice(self, start=None, end=None, is_rel=False, plenary=False, keep_bounds=T
             else:
                 start = (max(start[0], 0), max(start[1], 0))
                 end = (max(end[0], 0), max(end[1], 0))
-                if start == end:
+                sliced = self._slice_view(start, end) if self._view is not None else None
+                if sliced is not None or start == end:
                     new_content = []
                 else:
                     new_content = [self.content[start[0]][start[1]:]]
@@ -499,7 +773,10 @@ def slice(self, start=None, end=None, is_rel=False, plenary=False, keep_bounds=T
                                   else self.start_lincol)
                 else:
                     lincol_abs = None
-                new = Fragment(self.filename, new_content, pos_abs, start_lincol=lincol_abs)
+                if sliced is not None:
+                    new = self._new_view(sliced[0], pos_abs, lincol_abs, sliced[1], sliced[2])
+                else:
+                    new = Fragment(self.filename, new_content, pos_abs, start_lincol=lincol_abs)
                 start_pos_abs = new.end_pos
 
             result.append(new)
@@ -507,6 +784,49 @@ def slice(self, start=None, end=None, is_rel=False, plenary=False, keep_bounds=T
         return result[0] if len(result) == 1 else tuple(result)
 
 
+    def _slice_view(self, start, end):
+        """Returns the view of the span between the relative lincol locations,
+        the count of lines and the length of the last line
+        or None if the content would start with a zero length line.
+        """
+        source, offset, _, is_zero_end = self._view
+        if start == end:
+            return (source, offset, offset, False), 0, 0
+
+        offsets = self.line_offsets()
+        line_count = len(offsets) - 1
+        if start[0] >= line_count:
+            return None
+
+        line_start = offsets[start[0]]
+        line_len = offsets[start[0] + 1] - line_start
+        if start[0] == end[0]:
+            view_start = line_start + min(start[1], line_len)
+            view_end = line_start + min(end[1], line_len)
+            is_zero_end = False
+            last_len = view_end - view_start
+            line_count = 1 if last_len > 0 else 0
+        else:
+            if start[1] >= line_len:
+                return None
+            view_start = line_start + start[1]
+            if end[0] < line_count:
+                last_len = min(end[1], offsets[end[0] + 1] - offsets[end[0]])
+                view_end = offsets[end[0]] + last_len
+                is_zero_end = bool(last_len == 0)
+                line_count = end[0] - start[0] + 1
+            else:
+                view_end = offsets[-1]
+                last_len = offsets[-1] - offsets[-2]
+                line_count -= start[0]
+            if view_end < view_start:
+                return None
+            if line_count == 1:
+                last_len = view_end - view_start
+
+        return (source, offset + view_start, offset + view_end, is_zero_end), line_count, last_len
+
+
     def slice_block(self, start=None, end=None, is_rel=False, plenary=False, keep_bounds=True,
                     include_before=False, include_after=False):
         """Returns a rectangular block defined by the start and end corners."""
@@ -557,7 +877,15 @@ def splitlines(self, buffered=False):
         start_pos = self.start_pos
         apply_colno_offset = True
         lineno_offset = self.start_lincol[0] if self.start_lincol else 0
-        for lineno, line_str in enumerate(self.content, lineno_offset):
+        is_view = bool(self._view is not None)
+        if is_view:
+            source, offset = self._view[:2]
+            offsets = self.line_offsets()
+            lines = ((source, offset + line_start, offset + line_end, False)
+                     for line_start, line_end in zip(offsets, offsets[1:]))
+        else:
+            lines = self.content
+        for lineno, line_str in enumerate(lines, lineno_offset):
             if self.start_lincol:
                 if apply_colno_offset:
                     start_lincol = (lineno, self.start_lincol[1])
@@ -566,7 +894,12 @@ def splitlines(self, buffered=False):
                     start_lincol = (lineno, 0)
             else:
                 start_lincol = None
-            line = Fragment(self.filename, line_str, start_pos, start_lincol=start_lincol)
+            if is_view:
+                line_len = line_str[2] - line_str[1]
+                line = self._new_view(line_str, start_pos, start_lincol, 1 if line_len else 0,
+                                      line_len)
+            else:
+                line = Fragment(self.filename, line_str, start_pos, start_lincol=start_lincol)
             yield line
             start_pos = line.end_pos
 
@@ -599,8 +932,14 @@ def reversed_splitlines(self, buffered=False):
 
     def iter_lines(self, buffered=False):
         """Yield content lines."""
-        for line_str in self.content:
-            yield line_str
+        if self._view is not None:
+            text, offset = self._view[0].text, self._view[1]
+            offsets = self.line_offsets()
+            for line_start, line_end in zip(offsets, offsets[1:]):
+                yield text[offset + line_start:offset + line_end]
+        else:
+            for line_str in self.content:
+                yield line_str
         if buffered:
             yield None
 
@@ -623,6 +962,7 @@ def replace(self, new_content, open_end=True, flush=True):
                 new_content.extend(self.content[len(new_content):])
 
         self.content = new_content
+        self._offsets = None
         return self
 
 
@@ -638,6 +978,7 @@ def replace_over(self, new_content, open_end=True, flush=True):
         if not flush:
             new_content.extend(self.content[len(new_content):])
         self.content = new_content
+        self._offsets = None
         return self
 
 
@@ -650,7 +991,7 @@ def replace_fill(self, filler, layout=None, spread=None, is_eol_end=None, _recur
             new_content = filler
         elif layout == "straight":
             if not _recursive:
-                self.content.clear()
+                self.content = []
                 new_content = str(FragmentBundle([self]).replace_fill(
                                   filler, layout, spread, is_eol_end, _recursive=True))
             else:
@@ -744,12 +1085,13 @@ def replace_fill(self, filler, layout=None, spread=None, is_eol_end=None, _recur
             raise ValueError("'Fragment.replace_fill' unknown layout:", layout)
 
         self.content = new_content.splitlines(keepends=True)
+        self._offsets = None
         return self
 
 
     def clear(self, start_end):
         """Remove content. Turn into zero-length Fragment at start or end."""
-        self.content.clear()
+        self.content = []
         if start_end:
             self.end_pos = self.start_pos
             self.end_lincol = self.start_lincol
@@ -869,17 +1211,18 @@ def switch_lincol(self, before=None):
             if before.is_bundle():
                 before = before.bundle[-1]
             if (self.start_lincol and before.is_aligned(self, False) and
-                    before.content and before.content[-1].endswith('\n')):
+                    before._is_eol_end()):
                 new_start = (self.start_lincol[0] + 1, 0)
                 if self.start_lincol == self.end_lincol:
                     self.end_lincol = new_start
                 self.start_lincol = new_start
 
-        if (not self.end_lincol or not self.content or
+        if (not self.end_lincol or self.is_empty() or
                 self.end_lincol[1] != 0 or self.end_lincol == self.start_lincol):
             return self
-        if self.content[-1].endswith('\n'):
-            self.end_lincol = (self.end_lincol[0] - 1, len(self.content[-1]))
+        if self._is_eol_end():
+            offsets = self.line_offsets()
+            self.end_lincol = (self.end_lincol[0] - 1, offsets[-1] - offsets[-2])
 
         return self
 
@@ -977,16 +1320,13 @@ def lincol_to_pos(self, lincol, is_rel=False, output_rel=False, keep_bounds=Fals
                 return self.start_pos if not output_rel else 0
             return None
 
-        cursor = 0
-        for index, line in enumerate(self.content):
-            if lincol[0] == index:
-                cursor += lincol[1]
-                return self.loc_to_abs(cursor) if not output_rel else cursor
-
-            cursor += len(line)
+        offsets = self.line_offsets()
+        if lincol[0] < len(offsets) - 1:
+            cursor = offsets[lincol[0]] + lincol[1]
+            return self.loc_to_abs(cursor) if not output_rel else cursor
 
         if keep_bounds:
-            return self.loc_to_abs(cursor) if not output_rel else cursor
+            return self.loc_to_abs(offsets[-1]) if not output_rel else offsets[-1]
 
 
     def pos_to_lincol(self, pos, is_rel=False, output_rel=False, keep_bounds=False):
@@ -998,23 +1338,55 @@ def pos_to_lincol(self, pos, is_rel=False, output_rel=False, keep_bounds=False):
                 return self.start_lincol if not output_rel and self.start_lincol else (0, 0)
             return None
 
-        cursor = 0
-        for index, line in enumerate(self.content):
-            # favor next line start over current end
-            if pos >= cursor and pos - cursor < len(line):
-                cursor = (index, pos - cursor)
-                return self.loc_to_abs(cursor) if not output_rel else cursor
-
-            cursor += len(line)
+        offsets = self.line_offsets()
+        line_count = len(offsets) - 1
+        # favor next line start over current end
+        index = bisect_right(offsets, pos, 0, line_count) - 1
+        if index >= 0 and pos < offsets[index + 1]:
+            cursor = (index, pos - offsets[index])
+            return self.loc_to_abs(cursor) if not output_rel else cursor
 
         if keep_bounds:
-            if len(self.content) == 0:
+            if line_count == 0:
                 return self.loc_to_abs((0, 0)) if not output_rel else (0, 0)
 
-            cursor = (len(self.content) - 1, len(self.content[-1]))
+            cursor = (line_count - 1, offsets[-1] - offsets[-2])
             return self.loc_to_abs(cursor) if not output_rel else cursor
 
 
+    def line_offsets(self):
+        """Return the char offsets of the line starts relative to the start and the content length.
+        Built on first use, rebuilt if the content list has been replaced or resized.
+        """
+        offsets = self._offsets
+        view = self._view
+        if view is not None:
+            if offsets is None or offsets[0] is not view:
+                offsets = (view, self._view_offsets())
+                self._offsets = offsets
+            return offsets[1]
+
+        content = self._content
+        if (offsets is None or offsets[0] is not content or
+                len(offsets[1]) != len(content) + 1):
+            offsets = (content, list(accumulate(map(len, content), initial=0)))
+            self._offsets = offsets
+        return offsets[1]
+
+
+    def _view_offsets(self):
+        """Returns the line offsets taken from the line starts of the buffer."""
+        source, start, end, is_zero_end = self._view
+        offsets = [0]
+        if start != end:
+            first, last = source.line_span(start, end)
+            offsets.extend(line_start - start for line_start in source.line_starts()[first:last])
+            offsets.append(end - start)
+        if is_zero_end:
+            offsets.append(end - start)
+        return offsets
+
+
     def is_in_span(self, loc, is_rel=False, include_start=True, include_end=True):
         """Check if the location is between start and end."""
         if is_rel:
@@ -1047,7 +1419,7 @@ def is_aligned(self, other, pos_lincol, **_):
             if self.end_lincol == other.start_lincol:
                 return True
             if (other.start_lincol[1] == 0 and self.end_lincol[0] + 1 == other.start_lincol[0] and
-                    self.content and self.content[-1].endswith('\n')):
+                    self._is_eol_end()):
                 return True
 
         return False
@@ -1094,7 +1466,9 @@ def copy_loc(self, other, *_):
 
     def __len__(self):
         """Returns the content char length."""
-        return sum(map(len, self.content))
+        if self._view is not None:
+            return self._view[2] - self._view[1]
+        return sum(map(len, self._content))
 
 
     def span_len(self, pos_lincol):
@@ -1128,7 +1502,16 @@ def size(self, pos_lincol):
 
 
     def is_empty(self):
-        return len(self.content) == 0
+        if self._view is not None:
+            return self._view[1] == self._view[2] and not self._view[3]
+        return len(self._content) == 0
+
+
+    def is_split_text(self, text):
+        """Check if the content is the text split into lines."""
+        if self._view is not None:
+            return not self._view[3] and str(self) == text
+        return self._content == text.splitlines(keepends=True)
 
 
     def is_len_correlated(self, pos_lincol=None, **_):
@@ -1138,8 +1521,8 @@ def is_len_correlated(self, pos_lincol=None, **_):
                 return False
 
         if pos_lincol is None or pos_lincol is False:
-            size = (max(len(self.content) - 1, 0),
-                    0 if len(self.content) == 0 else len(self.content[-1]))
+            line_count, last_len = self._line_dims()
+            size = (max(line_count - 1, 0), last_len)
             span = (self.end_lincol[0] - self.start_lincol[0],
                     self.end_lincol[1] - self.start_lincol[1]
                     if self.end_lincol[0] == self.start_lincol[0] else
@@ -1160,7 +1543,7 @@ def correlate_len(self, pos_lincol=None, start_end=False, other=None, **_):
 
         if pos_lincol is None or pos_lincol is False:
             if start_end:
-                if len(self.content) == 0:
+                if self.is_empty():
                     self.start_lincol = self.end_lincol
                 else:
                     if other is None:
@@ -1170,14 +1553,13 @@ def correlate_len(self, pos_lincol=None, start_end=False, other=None, **_):
                         self.start_pos if pos_lincol is None else
                         self.end_pos - len(self))
             else:
-                if len(self.content) == 0:
+                line_count, last_len = self._line_dims()
+                if line_count == 0:
                     self.end_lincol = self.start_lincol
-                elif len(self.content) == 1:
-                    self.end_lincol = (self.start_lincol[0],
-                                       self.start_lincol[1] + len(self.content[-1]))
+                elif line_count == 1:
+                    self.end_lincol = (self.start_lincol[0], self.start_lincol[1] + last_len)
                 else:
-                    self.end_lincol = (self.start_lincol[0] + max(0, len(self.content) - 1),
-                                       len(self.content[-1]))
+                    self.end_lincol = (self.start_lincol[0] + line_count - 1, last_len)
         return self
 
 
@@ -1204,15 +1586,12 @@ def __eq__(self, other):
         if self is other:
             return True
 
-        for prop in self.__slots__:
+        for prop in ('filename', 'start_pos', 'end_pos', 'start_lincol', 'end_lincol'):
             if getattr(self, prop) != getattr(other, prop):
-                # one of the content is same list or str then compare the effective
-                if (prop != "content" or
-                        type(self.content) != type(other.content) or
-                        ''.join(self.content) != ''.join(other.content)):
-                    return False
+                return False
 
-        return True
+        # compare the effective content
+        return str(self) == str(other)
 
 
     def __ne__(self, other):
@@ -1244,7 +1623,12 @@ def join(self, **_):
 
     def __str__(self):
         """Returns the joined content list."""
-        return str(''.join(self.content))
+        if self._view is not None:
+            source, start, end = self._view[:3]
+            return source.text[start:end]
+        if self._text is None:
+            self._text = ''.join(self._content)
+        return self._text
 
 
     def __repr__(self):
@@ -1268,19 +1652,46 @@ def repr(self, show_pos, show_filename=False, show_content=True):
 
 
     def copy(self):
-        """Returns a deep copy."""
-        return Fragment(self.filename, self.content.copy(), self.start_pos,
-                        self.end_pos, self.start_lincol, self.end_lincol,
-                        bool(self.start_lincol is not None))
+        """Returns a deep copy (a view shares the buffer)."""
+        if self._view is None:
+            new = Fragment(self.filename, self._content, self.start_pos,
+                           self.end_pos, self.start_lincol, self.end_lincol,
+                           bool(self.start_lincol is not None))
+            if self._offsets is not None and self._offsets[0] is self._content:
+                new._offsets = (new._content, self._offsets[1])
+            new._text = self._text
+            return new
+
+        new = Fragment.__new__(Fragment)
+        new.filename = self.filename
+        new._content = None
+        new._view = self._view
+        new._offsets = self._offsets
+        new._text = None
+        new.start_pos = self.start_pos
+        new.end_pos = self.end_pos
+        new.start_lincol = self.start_lincol
+        new.end_lincol = self.end_lincol
+        if self.end_pos is None or (self.start_lincol is not None and self.end_lincol is None):
+            if self.end_pos is None and self.end_lincol is None and self.start_lincol is not None:
+                pos_lincol = None
+            else:
+                pos_lincol = bool(self.end_pos is None)
+            new.correlate_len(pos_lincol=pos_lincol, start_end=False)
+        return new
 
 
 # ============================================================================
 
 
 class FragmentBundle(Fragment):
-    """A list of Fragments. Well formed if: sorted, non overlapping."""
+    """A list of Fragments. Well formed if: sorted, non overlapping.
 
-    __slots__ = ('bundle',)
+    The location queries use an index of the Fragments sorted by start.
+    It is rebuilt if the bundle list has been replaced or resized or changed by the methods.
+    """
+
+    __slots__ = ('bundle', '_index')
 
 
     def __init__(self, bundle=None):
@@ -1289,6 +1700,16 @@ def __init__(self, bundle=None):
             bundle = []
 
         self.bundle = bundle
+        self._index = None
+
+
+    def __getstate__(self):
+        return None, {"bundle": self.bundle}
+
+
+    def __setstate__(self, state):
+        self.bundle = state[1]["bundle"]
+        self._index = None
 
 
     def get_filename(self):
@@ -1315,6 +1736,7 @@ def set_start_pos(self, value):
         if not self:
             return
         self.bundle[0].start_pos = value
+        self._index = None
 
     start_pos = property(get_start_pos, set_start_pos)
 
@@ -1326,6 +1748,7 @@ def set_end_pos(self, value):
         if not self:
             return
         self.bundle[-1].end_pos = value
+        self._index = None
 
     end_pos = property(get_end_pos, set_end_pos)
 
@@ -1337,6 +1760,7 @@ def set_start_lincol(self, value):
         if not self:
             return
         self.bundle[0].start_lincol = value
+        self._index = None
 
     start_lincol = property(get_start_lincol, set_start_lincol)
 
@@ -1348,6 +1772,7 @@ def set_end_lincol(self, value):
         if not self:
             return
         self.bundle[-1].end_lincol = value
+        self._index = None
 
     end_lincol = property(get_end_lincol, set_end_lincol)
 
@@ -1371,6 +1796,7 @@ def extend(self, new_content, keep_end=False):
             return self
 
         self.bundle[-1].extend(new_content, keep_end)
+        self._index = None
         return self
 
 
@@ -1379,6 +1805,7 @@ def rermove_zero_len_end(self):
             return self
 
         self.bundle[-1].rermove_zero_len_end()
+        self._index = None
         return self
 
 
@@ -1408,6 +1835,7 @@ def combine(self, other, check_align=True, pos_lincol=True, keep_end=False, merg
                 self.bundle.extend(bundle[1:])
         else:
             self.bundle.extend(bundle)
+        self._index = None
 
         if is_before:
             self.sort(pos_lincol)
@@ -1559,9 +1987,10 @@ def symmetric_difference(self, other, pos_lincol):
 
     def _transfere_attr(self, other):
         for prop in super().__slots__ + self.__slots__:
-            if prop == "content":
+            if prop in {"_content", "_offsets", "_view", "_text", "_index"}:
                 continue
             setattr(self, prop, getattr(other, prop))
+        self._index = None
 
 
     def union_update(self, *args):
@@ -1602,7 +2031,53 @@ def slice_match(self, match_obj, group, plenary=False, keep_bounds=True, filler=
 
         return self.slice(self.loc_to_abs(match_obj.start(group), filler),
                           self.loc_to_abs(match_obj.end(group), filler),
-                          plenary, keep_bounds)
+                          False, plenary, keep_bounds)
+
+
+    def slice_matches(self, spans, keep_bounds=True, filler=None):
+        """relative to first. The pieces are walked once if the spans are sorted."""
+        if not self or filler is None:
+            for start, end in spans:
+                if not self:
+                    yield self.copy()
+                elif start < 0:
+                    yield None
+                else:
+                    yield self.slice(self.loc_to_abs(start), self.loc_to_abs(end),
+                                     False, False, keep_bounds)
+            return
+
+        filler = len(filler) if filler else 0
+        state = (0, 0, None)
+        loc_prev = 0
+
+        def to_abs(loc_rel):
+            """Same as loc_to_abs continuing from the previous piece."""
+            nonlocal state, loc_prev
+            if loc_rel < loc_prev:
+                state = (0, 0, None)
+            loc_prev = loc_rel
+            index, cursor, prev = state
+            while index < len(self.bundle):
+                piece = self.bundle[index]
+                state = (index, cursor, prev)
+                if prev is not None and prev != piece.start_pos:
+                    if loc_rel <= cursor + filler:
+                        return prev + loc_rel - cursor
+                    cursor += filler
+                if loc_rel <= cursor + piece.span_len(True):
+                    return piece.loc_to_abs(loc_rel - cursor)
+                cursor += piece.span_len(True)
+                prev = piece.end_pos
+                index += 1
+            state = (index, cursor, prev)
+            return None
+
+        for start, end in spans:
+            if start < 0:
+                yield None
+            else:
+                yield self.slice(to_abs(start), to_abs(end), False, False, keep_bounds)
 
 
     def slice(self, start=None, end=None, is_rel=False, plenary=False, keep_bounds=True):
@@ -1648,11 +2123,11 @@ def slice(self, start=None, end=None, is_rel=False, plenary=False, keep_bounds=T
         result = []
         for index_start, start, index_end, end in cuts:
             if start <= self.get_start(pos_lincol) and end <= self.get_start(pos_lincol):
-                new = self.bundle[0].clear(True) if keep_bounds else None
+                new = self.bundle[0].copy().clear(True) if keep_bounds else None
             elif end >= self.get_end(pos_lincol) and start <= self.get_start(pos_lincol):
                 new = self.copy()
             elif start >= self.get_end(pos_lincol):
-                new = self.bundle[-1].clear(False) if keep_bounds else None
+                new = self.bundle[-1].copy().clear(False) if keep_bounds else None
             elif start == end and not keep_bounds:
                 new = None
             else:
@@ -1750,6 +2225,7 @@ def replace(self, new_content, open_end=True, flush=True):
                 for content in new_content[len(self.bundle):]:
                     self.bundle[-1].extend(content)
 
+        self._index = None
         return self
 
 
@@ -1772,6 +2248,7 @@ def replace_over(self, new_content, open_end=True, flush=True):
                 piece.replace_over("")
             else:
                 break
+        self._index = None
         return self
 
 
@@ -1834,6 +2311,7 @@ def paired():
                                      piece.end_lincol[0] + 1 == piece.start_lincol[0])),
                                _recursive=_recursive)
             last = cur
+        self._index = None
         return self
 
 
@@ -1866,6 +2344,7 @@ def sort(self, pos_lincol, start_end=False):
                              if start_end else
                              (lambda piece: (piece.get_end(pos_lincol),
                                              piece.get_start(pos_lincol))))
+        self._index = None
 
 
     # -- Location ------------------------------------------------------------
@@ -1885,6 +2364,7 @@ def move(self, pos=None, lincol=None, is_rel=False, start_end=True,
         for piece in self:
             piece.move(pos, lincol, is_rel=True, other=other, keep_bounds=keep_bounds)
 
+        self._index = None
         return self
 
 
@@ -1896,6 +2376,7 @@ def switch_lincol(self, before=None):
                 len(self.bundle) != 1):
             before = self.bundle[-2]
         self.bundle[-1].switch_lincol(before=before)
+        self._index = None
         return self
 
 
@@ -1938,7 +2419,7 @@ def loc_to_abs(self, loc_rel, filler=None):
                     return piece.loc_to_abs((loc_rel[0] - cursor[0], loc_rel[1] - cursor[1]))
                 cursor = cursor_end
                 if ((span_len[0] > 1 and piece.end_lincol[1] == 0) or
-                        (piece.content and piece.content[-1].endswith('\n'))):
+                        piece._is_eol_end()):
                     cursor[0] += 1
                     cursor[1] = 0
 
@@ -1983,7 +2464,7 @@ def loc_to_rel(self, loc_abs, filler=None):
                         cursor[1] = (rec.end_lincol[1] if span_len[0] > 1 else
                                      cursor[1] + rec.end_lincol[1])
                         if ((span_len[0] > 1 and rec.end_lincol[1] == 0) or
-                                (rec.content and rec.content[-1].endswith('\n'))):
+                                rec._is_eol_end()):
                             cursor[0] += 1
                             cursor[1] = 0
                         prev = rec.end_pos
@@ -2094,11 +2575,57 @@ def pos_to_lincol(self, pos, is_rel=False, output_rel=False, keep_bounds=False):
             return self.end_pos if not output_rel else self.loc_to_rel(self.end_lincol)
 
 
+    def _span_index(self, pos_lincol):
+        """Return the spans of the Fragments sorted by start.
+        None if a Fragment has no location (then the lincol switches to pos) or is a bundle.
+        """
+        if (self._index is None or self._index[0] is not self.bundle or
+                self._index[1] != len(self.bundle)):
+            self._index = (self.bundle, len(self.bundle), {})
+
+        cache = self._index[2]
+        if pos_lincol in cache:
+            return cache[pos_lincol]
+
+        spans = []
+        for order, piece in enumerate(self.bundle):
+            start = piece.get_start(pos_lincol)
+            end = piece.get_end(pos_lincol)
+            if piece.is_bundle() or start is None or end is None:
+                cache[pos_lincol] = None
+                return None
+            spans.append((start, end, order) if start <= end else (end, start, order))
+
+        spans.sort()
+        starts = [span[0] for span in spans]
+        ends = [span[1] for span in spans]
+        orders = [span[2] for span in spans]
+        cache[pos_lincol] = (starts, ends, list(accumulate(ends, max)), orders)
+        return cache[pos_lincol]
+
+
+    def _iter_span(self, spans, start, end):
+        """Yield the order of the Fragments whose span touches the range."""
+        starts, ends, max_ends, orders = spans
+        index = bisect_right(starts, end) - 1
+        while index >= 0 and max_ends[index] >= start:
+            if ends[index] >= start:
+                yield orders[index]
+            index -= 1
+
+
     def index_at(self, loc, is_rel=False, include_start=True, include_end=True):
         """Return index of the first Fragment which has the loc within it's span."""
-        for index, piece in enumerate(self):
-            if piece.is_in_span(loc, is_rel, include_start, include_end):
-                return index
+        spans = self._span_index(isinstance(loc, int)) if not is_rel else None
+        if spans is None:
+            for index, piece in enumerate(self):
+                if piece.is_in_span(loc, is_rel, include_start, include_end):
+                    return index
+            return None
+
+        return min((index for index in self._iter_span(spans, loc, loc)
+                    if self.bundle[index].is_in_span(loc, False, include_start, include_end)),
+                   default=None)
 
 
     def index_clip(self, loc, prev_next, is_rel=False):
@@ -2122,10 +2649,16 @@ def is_in_span(self, loc, is_rel=False, include_start=True, include_end=True):
         if not self:
             return False
 
-        for piece in self:
-            if piece.is_in_span(loc, is_rel, include_start, include_end):
-                return True
+        spans = self._span_index(isinstance(loc, int)) if not is_rel else None
+        if spans is None:
+            for piece in self:
+                if piece.is_in_span(loc, is_rel, include_start, include_end):
+                    return True
+            return False
 
+        for index in self._iter_span(spans, loc, loc):
+            if self.bundle[index].is_in_span(loc, False, include_start, include_end):
+                return True
         return False
 
 
@@ -2148,17 +2681,41 @@ def is_overlapped(self, other, pos_lincol):
         if not self or not other:
             return False
 
-        for piece_own in self:
-            for piece_other in other:
-                if piece_own.is_overlapped(piece_other, pos_lincol):
+        for piece_other in other:
+            # the Fragments switch to pos if a lincol is missing
+            spans = None
+            if pos_lincol or (piece_other.start_lincol and piece_other.end_lincol):
+                spans = self._span_index(pos_lincol)
+
+            if spans is None or piece_other.is_bundle():
+                for piece_own in self:
+                    if piece_own.is_overlapped(piece_other, pos_lincol):
+                        return True
+                continue
+
+            start = piece_other.get_start(pos_lincol)
+            end = piece_other.get_end(pos_lincol)
+            for index in self._iter_span(spans, min(start, end), max(start, end)):
+                if self.bundle[index].is_overlapped(piece_other, pos_lincol):
                     return True
         return False
 
 
     def is_self_overlapped(self, pos_lincol):
         """Check for overlaps within itself."""
+        spans = self._span_index(pos_lincol)
+        if spans is None:
+            for piece in self.bundle:
+                for rec in self.bundle:
+                    if rec is not piece and piece.is_overlapped(rec, pos_lincol):
+                        return True
+            return False
+
         for piece in self.bundle:
-            for rec in self.bundle:
+            start = piece.get_start(pos_lincol)
+            end = piece.get_end(pos_lincol)
+            for index in self._iter_span(spans, min(start, end), max(start, end)):
+                rec = self.bundle[index]
                 if rec is not piece and piece.is_overlapped(rec, pos_lincol):
                     return True
 
@@ -2191,6 +2748,7 @@ def copy_loc(self, other, deep=True):
         else:
             for piece, piece_other in zip(self, other):
                 piece.copy_loc(piece_other)
+        self._index = None
         return self
 
 
@@ -2315,6 +2873,7 @@ def correlate_len(self, pos_lincol=None, start_end=False, other=None, individual
             len_org = piece.span_len(True)
             piece.correlate_len(pos_lincol, start_end, other)
             offset += piece.span_len(True) - len_org
+        self._index = None
         return self
 
 
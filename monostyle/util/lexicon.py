@@ -120,8 +120,10 @@ def iter_sections(self, first_char):
             yield from self.data[first_char].items()
 
 
-    def add(self, word_str, do_norm=True):
-        """Adds a word to the lexicon."""
+    def add(self, word_str, do_norm=True, count=1):
+        """Adds a word to the lexicon.
+        count -- number of occurrences.
+        """
         if len(word_str) == 0:
             return
         if do_norm:
@@ -133,9 +135,9 @@ def add(self, word_str, do_norm=True):
             self.data.setdefault(first_char, dict())
 
         if entry := self.find(word_str):
-            entry["_counter"] += 1
+            entry["_counter"] += count
         else:
-            entry = {"_counter": 0}
+            entry = {"_counter": count - 1}
             self.data[first_char][word_str] = entry
         return entry
 
@@ -426,3 +426,51 @@ def shift(self):
         item.prev = None
         item.next = None
         return item
+
+
+class LazyLinkedList(LinkedList):
+    """Linked list which is filled by a callback on first access."""
+
+    __slots__ = ('_fill',)
+
+    def __init__(self, parent=None, fill=None):
+        """
+        fill -- callback which appends the nodes.
+        """
+        super().__init__(parent)
+        self._fill = fill
+
+
+    def is_loaded(self):
+        """Check if the fill callback has run."""
+        return self._fill is None
+
+
+    def load(self):
+        """Run the fill callback once."""
+        if self._fill is not None:
+            fill = self._fill
+            self._fill = None
+            fill()
+        return self
+
+
+def _load_first(method):
+    """Wrap the method to load the list before."""
+    def wrapper(self, *args, **kwargs):
+        if self._fill is not None:
+            self.load()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+# clear drops the callback by re-init
+for _method_name in ('copy', 'is_linked', '__len__', 'is_empty', 'first', 'last', '__str__',
+                     '__repr__', 'to_list', '__iter__', '__reversed__', '__contains__', 'count',
+                     'index', 'iter_slice', '__getitem__', '__setitem__', '__delitem__',
+                     'insert_after', 'insert_before', 'append', 'prepend', 'extend', 'remove',
+                     'pop', 'shift'):
+    setattr(LazyLinkedList, _method_name, _load_first(getattr(LinkedList, _method_name)))
@@ -14,11 +14,12 @@ class PartofSpeech:
     """Part of speech tagging."""
 
     def __new__(cls):
-        if not hasattr(cls, '__loaded'):
-            cls.__loaded = True
+        if not hasattr(cls, '_loaded'):
+            cls._loaded = True
             char_catalog = CharCatalog()
             cls.data = get_data_file("part_of_speech")
             cls.remove_comments(cls, cls.data)
+            cls.build_index(cls, cls.data)
 
             # acronym
             pattern_str = (
@@ -59,6 +60,41 @@ def remove_comments(cls, obj):
             del obj[key]
 
 
+    def build_index(cls, obj):
+        """Flatten the lists of the data tree to leafs in search order
+        with a word lookup and a reversed suffix trie pointing to them.
+        """
+        def flatten(obj, path):
+            own = []
+            for key, value in obj.items():
+                if isinstance(value, dict):
+                    flatten(value, path + (key,))
+                elif isinstance(value, list):
+                    leaf = len(cls.leafs)
+                    # a match in an underscore list ends the search in its branch without a tag
+                    cls.leafs.append([path + (key,) if not key.startswith("_") else None,
+                                      None, bool(key == "participle")])
+                    own.append(leaf)
+                    if key == "_suffix":
+                        for entry in value:
+                            node = cls.suffix_trie
+                            for char in reversed(entry):
+                                node = node.setdefault(char, {})
+                            node.setdefault(None, []).append(leaf)
+                    else:
+                        for entry in value:
+                            cls.word_index.setdefault(entry, []).append(leaf)
+
+            # end of the branch
+            for leaf in own:
+                cls.leafs[leaf][1] = len(cls.leafs)
+
+        cls.leafs = []
+        cls.word_index = {}
+        cls.suffix_trie = {}
+        flatten(obj, ())
+
+
     def get(self, branch, index=0, joined=False):
         """
         joined -- join all subordinate leafs.
@@ -83,34 +119,31 @@ def iter_sub(obj):
 
     def tag(self, word):
         """Assign POS tag."""
-        def search(obj, word):
-            if not isinstance(obj, str):
-                branch = []
-                for key, value in obj.items():
-                    if isinstance(value, dict):
-                        result = search(value, word)
-                        if result and len(result) != 0:
-                            branch.append(key)
-                            branch.extend(result)
-                            return branch
-
-                    elif isinstance(value, list):
-                        if (key == "participle" and
-                                (self.prev is None or len(self.prev) == 0 or
-                                 self.prev[0] != "auxiliary")):
-                            continue
-
-                        is_suffix = bool(key == "_suffix")
-                        for entry in value:
-                            if ((is_suffix and word.endswith(entry)) or
-                                    (not is_suffix and word == entry)):
-                                if not key.startswith("_"):
-                                    branch.append(key)
-                                return branch
-
-                return branch
+        leafs = set(self.word_index.get(word, ()))
+        node = self.suffix_trie
+        index = len(word)
+        while node is not None:
+            if None in node:
+                leafs.update(node[None])
+            index -= 1
+            node = node.get(word[index]) if index >= 0 else None
+
+        branch = []
+        skip_end = -1
+        for leaf in sorted(leafs):
+            if leaf < skip_end:
+                continue
+            path, end, is_participle = self.leafs[leaf]
+            if (is_participle and
+                    (self.prev is None or len(self.prev) == 0 or
+                     self.prev[0] != "auxiliary")):
+                continue
+            if path is None:
+                skip_end = end
+                continue
+            branch = list(path)
+            break
 
-        branch = search(self.data, word)
         self.prev = branch
 
         return branch
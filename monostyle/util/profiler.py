@@ -0,0 +1,121 @@
+
+"""
+util.profiler
+~~~~~~~~~~~~~
+
+Timing of the processing stages and the tools.
+"""
+
+import time
+import json
+
+
+class Profiler:
+    """Records the wall time, call count, processed chars and emitted reports
+    of each stage and tool.
+
+    The entries are keyed by stage and name, e.g. ("parse", "") or ("tool", "markup.indention").
+    While inactive the clock returns None and nothing is recorded.
+    """
+
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance = super().__new__(cls)
+            cls.instance.is_active = False
+            cls.instance.records = {}
+            cls.instance.time_start = None
+        return cls.instance
+
+
+    def start(self):
+        """Activate the recording."""
+        self.is_active = True
+        self.records = {}
+        self.time_start = time.perf_counter()
+
+
+    def clock(self):
+        """Return the start time of a measurement."""
+        if self.is_active:
+            return time.perf_counter()
+
+
+    def add(self, stage, name, time_start, size=0, reports=0):
+        """Add a measurement started with the clock."""
+        if time_start is None:
+            return
+        duration = time.perf_counter() - time_start
+        record = self.records.get((stage, name))
+        if record is None:
+            self.records[(stage, name)] = [1, duration, size, reports]
+        else:
+            record[0] += 1
+            record[1] += duration
+            record[2] += size
+            record[3] += reports
+
+
+    def pop_records(self):
+        """Return the records and start new ones (to send them to another process)."""
+        records = self.records
+        self.records = {}
+        return records
+
+
+    def merge(self, records):
+        """Add the records of another process."""
+        for key, value in records.items():
+            record = self.records.get(key)
+            if record is None:
+                self.records[key] = list(value)
+            else:
+                for index, entry in enumerate(value):
+                    record[index] += entry
+
+
+    def entries(self):
+        """Return the records sorted by time descending."""
+        total = time.perf_counter() - self.time_start if self.time_start is not None else 0
+        entries = []
+        for (stage, name), (calls, duration, size, reports) in self.records.items():
+            entries.append({"stage": stage, "name": name, "calls": calls, "time": duration,
+                            "size": size, "reports": reports})
+        entries.sort(key=lambda entry: entry["time"], reverse=True)
+        return total, entries
+
+
+    def print_table(self):
+        """Print the records in the command line."""
+        total, entries = self.entries()
+        if not entries:
+            return
+
+        columns = ("stage", "name", "calls", "time s", "mean ms", "chars", "reports", "%")
+        rows = []
+        for entry in entries:
+            rows.append((entry["stage"], entry["name"], str(entry["calls"]),
+                         "{:.3f}".format(entry["time"]),
+                         "{:.3f}".format(entry["time"] / entry["calls"] * 1000),
+                         str(entry["size"]), str(entry["reports"]),
+                         "{:.1f}".format(entry["time"] / total * 100) if total else ""))
+
+        widths = [max(len(row[index]) for row in rows + [columns])
+                  for index in range(len(columns))]
+        print()
+        for row in [columns] + rows:
+            print("  ".join(value.ljust(width) if index < 2 else value.rjust(width)
+                            for index, (value, width) in enumerate(zip(row, widths))))
+        print("total: {:.3f} s".format(total))
+
+
+    def write(self, filename):
+        """Store the records as JSON."""
+        import monostyle
+
+        total, entries = self.entries()
+        data = {"version": monostyle.__version__, "total": total, "entries": entries}
+        try:
+            with open(filename, "w", encoding="utf-8") as profile_file:
+                json.dump(data, profile_file, indent=4)
+        except (IOError, OSError) as err:
+            print("{0}: cannot write profile: {1}".format(filename, err))
@@ -10,6 +10,58 @@
 from monostyle.util.char_catalog import CharCatalog
 from monostyle.util.part_of_speech import PartofSpeech
 
+
+class Token:
+    """Segment stored as offsets in its source.
+    The Fragment is only created on request e.g. for a report.
+    """
+
+    __slots__ = ('source', 'start', 'end', '_text')
+
+
+    def __init__(self, source, start, end, text):
+        """
+        source -- Fragment the segment is taken from.
+        start, end -- relative positions within the source.
+        """
+        self.source = source
+        self.start = start
+        self.end = end
+        self._text = text
+
+
+    def __str__(self):
+        return self._text
+
+
+    def __len__(self):
+        return len(self._text)
+
+
+    def __repr__(self):
+        return "Token({0!r}, {1}, {2})".format(self._text, self.start, self.end)
+
+
+    def fragment(self):
+        """Return the segment as a Fragment."""
+        return self.source.slice(self.start, self.end, is_rel=True)
+
+
+def token_factory(source):
+    """Return a function which creates tokens from relative positions within the source.
+    A token as source is resolved to its source.
+    """
+    if isinstance(source, Token):
+        base, offset = source.source, source.start
+    else:
+        base, offset = source, 0
+
+    def create(start, end, text):
+        return Token(base, offset + start, offset + end, text)
+
+    return create
+
+
 class Segmenter:
     """Text segmentation and tokenization."""
 
@@ -68,149 +120,328 @@ def __new__(cls):
             cls.number_re = re.compile(''.join(pattern_str))
 
             cls.abbr_re = part_of_speech.abbr_re
-            cls.abbrs = []
+            cls.abbrs = set()
             for entry in part_of_speech.get(("abbreviation",), joined=True):
                 if not re.match(cls.abbr_re, entry):
-                    cls.abbrs.append(entry)
+                    cls.abbrs.add(entry)
 
             cls.instance = super().__new__(cls)
         return cls.instance
 
 
-    def iter_paragraph(self, source):
-        buf_start = 0
-        para_re = self.para_re
+    def _view(self, source, spans, lazy):
+        """Yield the spans as Fragments or Tokens, None for a negative start."""
+        if not lazy:
+            yield from source.slice_matches(spans)
+            return
+
+        token = token_factory(source)
         text = str(source)
-        for para_m in re.finditer(para_re, text):
-            yield (source.slice(buf_start, para_m.end(0), is_rel=True),
-                   source.slice_match(para_m, 0))
+        for start, end in spans:
+            yield token(start, end, text[start:end]) if start >= 0 else None
+
+
+    def _view_pairs(self, source, spans, lazy):
+        """Yield the spans with their separator as pairs of Fragments or Tokens."""
+        pieces = self._view(source, [span for start, end, sep in spans
+                                     for span in ((start, end), sep or (-1, -1))], lazy)
+        for piece in pieces:
+            yield piece, next(pieces)
+
+
+    def paragraph_spans(self, text):
+        """Return the spans of the paragraphs with the span of their separator or None."""
+        spans = []
+        buf_start = 0
+        for para_m in re.finditer(self.para_re, text):
+            spans.append((buf_start, para_m.end(0), para_m.span(0)))
             buf_start = para_m.end(0)
 
         if buf_start != len(text):
-            yield source.slice(buf_start, is_rel=True), None
+            spans.append((buf_start, len(text), None))
+        return spans
 
 
-    def iter_sentence(self, source, crop_start=False, crop_end=False):
+    def sentence_spans(self, text, crop_start=False, crop_end=False):
+        """Return the spans of the sentences with the span of their stop or None."""
+        spans = []
         buf_start = 0
-        sent_re = self.sent_re
-        text = str(source)
-        for sent_m in re.finditer(sent_re, text):
+        abbrs = self.abbrs
+        for sent_m in re.finditer(self.sent_re, text):
             if (sent_m.group(2) == "." and
                     sent_m.group(1) is not None and
-                    (re.match(self.abbr_re, sent_m.group(1)) or
-                     sent_m.group(1) in self.abbrs)):
+                    (sent_m.group(1) in abbrs or re.match(self.abbr_re, sent_m.group(1)))):
                 continue
 
             if crop_start and buf_start == 0:
                 buf_start = sent_m.end(0)
                 continue
 
-            yield (source.slice(buf_start, sent_m.end(0), is_rel=True),
-                   source.slice_match(sent_m, 2))
-
+            spans.append((buf_start, sent_m.end(0), sent_m.span(2)))
             buf_start = sent_m.end(0)
 
         if not crop_end and buf_start != len(text):
-            yield source.slice(buf_start, is_rel=True), None
+            spans.append((buf_start, len(text), None))
+        return spans
 
 
-    def iter_clause(self, source):
+    def clause_spans(self, text):
+        """Return the clauses as lists of the spans of their joined pieces."""
         # config: serial comma skip when less spaces
         threshold = 3
 
-        def do_not_skip(source, clause_source, is_non_oxford, is_buffered, was_non_oxford):
+        def do_not_skip(start, end, is_non_oxford, is_buffered, was_non_oxford):
             if is_non_oxford and is_buffered:
                 return False
             if was_non_oxford:
                 return True
-            clause_str = str(clause_source)
+            clause_str = text[start:end]
             if re.match(r"\s*however,", clause_str):
                 return False
             space_count = sum(1 for s in re.finditer(r"\S\s", clause_str)) -1
             if space_count <= threshold:
-                if (source.start_pos != clause_source.start_pos and
-                        source.end_pos != clause_source.end_pos):
+                if start != 0 and end != len(text):
                     return False
             if re.search(self.ellipsis_re, clause_str):
                 return False
             return True
 
-        clause_re = self.clause_re
-
+        clauses = []
         buf_start = 0
         buf = None
-        text = str(source)
         was_non_oxford = False
-        for clause_m in re.finditer(clause_re, text):
-            clause_source = source.slice(buf_start, clause_m.end(0), is_rel=True)
-            if do_not_skip(source, clause_source, bool(clause_m.group(2)),
-                           bool(buf), was_non_oxford):
+        for clause_m in re.finditer(self.clause_re, text):
+            span = (buf_start, clause_m.end(0))
+            if do_not_skip(*span, bool(clause_m.group(2)), bool(buf), was_non_oxford):
                 if buf is not None:
-                    yield buf
+                    clauses.append(buf)
                     buf = None
-                yield clause_source
+                clauses.append([span])
             else:
                 if buf is None:
-                    buf = clause_source
+                    buf = [span]
                 else:
-                    buf.combine(clause_source)
+                    buf.append(span)
 
             buf_start = clause_m.end(0)
             was_non_oxford = clause_m.group(2)
 
         if buf_start != len(text):
-            clause_source = source.slice(buf_start, is_rel=True)
-            if do_not_skip(source, clause_source, False, bool(buf), was_non_oxford):
+            span = (buf_start, len(text))
+            if do_not_skip(*span, False, bool(buf), was_non_oxford):
                 if buf is not None:
-                    yield buf
-                yield clause_source
+                    clauses.append(buf)
+                clauses.append([span])
             else:
                 if buf is None:
-                    buf = clause_source
+                    buf = [span]
                 else:
-                    buf.combine(clause_source)
-                yield buf
+                    buf.append(span)
+                clauses.append(buf)
+        return clauses
 
 
-    def iter_parenthesis(self, source):
+    def parenthesis_spans(self, text):
+        """Return the spans of the parentheses and the text between them."""
         # config: skip when less spaces
-        text = str(source)
         threshold = 3
+        spans = []
         buf_start = 0
-
-        pare_re = self.parenthesis_re
-        for pare_m in re.finditer(pare_re, text):
+        for pare_m in re.finditer(self.parenthesis_re, text):
             space_count = sum(1 for s in re.finditer(r"\S\s", pare_m.group(0))) - 1
             if space_count > threshold:
                 if buf_start != pare_m.start(0):
-                    yield source.slice(buf_start, pare_m.start(0), is_rel=True)
-                yield source.slice_match(pare_m, 0)
+                    spans.append((buf_start, pare_m.start(0)))
+                spans.append(pare_m.span(0))
                 buf_start = pare_m.end(0)
 
         if buf_start != len(text):
-            yield source.slice(buf_start, is_rel=True)
+            spans.append((buf_start, len(text)))
+        return spans
 
 
-    def iter_word(self, source, filter_numbers=True):
-        word_re = self.word_re
+    def word_spans(self, text, filter_numbers=True):
+        """Return the spans of the words."""
         number_filter_re = self.number_filter_re
-        text = str(source)
-        for word_m in re.finditer(word_re, text):
-            if not filter_numbers or not re.match(number_filter_re, word_m.group(0)):
-                yield source.slice_match(word_m, 1)
+        return [word_m.span(1) for word_m in re.finditer(self.word_re, text)
+                if not filter_numbers or not re.match(number_filter_re, word_m.group(0))]
 
 
-    def iter_wordsub(self, source, filter_numbers=True):
-        wordsub_re = self.wordsub_re
+    def wordsub_spans(self, text, filter_numbers=True):
+        """Return the spans of the words without connectors."""
         number_filter_re = self.number_filter_re
-        text = str(source)
-        for wordsub_m in re.finditer(wordsub_re, text):
-            if not filter_numbers or not re.match(number_filter_re, wordsub_m.group(0)):
-                yield source.slice_match(wordsub_m, 0)
+        return [wordsub_m.span(0) for wordsub_m in re.finditer(self.wordsub_re, text)
+                if not filter_numbers or not re.match(number_filter_re, wordsub_m.group(0))]
 
 
-    def iter_number(self, source):
-        number_re = self.number_re
-        text = str(source)
-        for number_m in re.finditer(number_re, text):
-            yield source.slice_match(number_m, 0)
+    def number_spans(self, text):
+        """Return the spans of the numbers."""
+        return [number_m.span(0) for number_m in re.finditer(self.number_re, text)]
+
+
+    def segment(self, source, paragraphs=True, filter_numbers=True):
+        """Return the boundary table of the source.
+        paragraphs -- split into paragraphs before the sentences,
+                      otherwise the source is a single paragraph.
+        """
+        return Segmentation(self, source, paragraphs, filter_numbers)
+
+
+    def iter_paragraph(self, source, lazy=False):
+        """
+        lazy -- yield Tokens instead of Fragments.
+        """
+        yield from self._view_pairs(source, self.paragraph_spans(str(source)), lazy)
+
+
+    def iter_sentence(self, source, crop_start=False, crop_end=False, lazy=False):
+        """
+        lazy -- yield Tokens instead of Fragments.
+        """
+        yield from self._view_pairs(source, self.sentence_spans(str(source), crop_start,
+                                                                crop_end), lazy)
+
+
+    def iter_clause(self, source, lazy=False):
+        """
+        lazy -- yield Tokens instead of Fragments.
+        """
+        for clause in self.clause_spans(str(source)):
+            if lazy:
+                yield next(self._view(source, ((clause[0][0], clause[-1][1]),), True))
+                continue
+
+            buf = None
+            for piece in self._view(source, clause, False):
+                if buf is None:
+                    buf = piece
+                else:
+                    buf.combine(piece)
+            yield buf
+
+
+    def iter_parenthesis(self, source, lazy=False):
+        """
+        lazy -- yield Tokens instead of Fragments.
+        """
+        yield from self._view(source, self.parenthesis_spans(str(source)), lazy)
+
+
+    def iter_word(self, source, filter_numbers=True, lazy=False):
+        """
+        lazy -- yield Tokens instead of Fragments.
+        """
+        yield from self._view(source, self.word_spans(str(source), filter_numbers), lazy)
+
+
+    def iter_wordsub(self, source, filter_numbers=True, lazy=False):
+        """
+        lazy -- yield Tokens instead of Fragments.
+        """
+        yield from self._view(source, self.wordsub_spans(str(source), filter_numbers), lazy)
+
+
+    def iter_number(self, source, lazy=False):
+        """
+        lazy -- yield Tokens instead of Fragments.
+        """
+        yield from self._view(source, self.number_spans(str(source)), lazy)
+
+
+class Segmentation:
+    """Boundary table of a source scanned once per level.
+    The spans are relative to the source, the lower levels are
+    split within the text of their sentence and store its index.
+    The clauses and words are split on first access.
+    """
+
+    __slots__ = ('segmenter', 'source', 'text', 'filter_numbers',
+                 'paragraphs', 'sentences', '_clauses', '_words', '_sentence_words')
+
+
+    def __init__(self, segmenter, source, paragraphs=True, filter_numbers=True):
+        self.segmenter = segmenter
+        self.source = source
+        self.text = str(source)
+        self.filter_numbers = filter_numbers
+        if paragraphs:
+            self.paragraphs = segmenter.paragraph_spans(self.text)
+        else:
+            self.paragraphs = [(0, len(self.text), None)] if self.text else []
+
+        self.sentences = []
+        for index, (para_start, para_end, _) in enumerate(self.paragraphs):
+            for start, end, stop in segmenter.sentence_spans(self.text[para_start:para_end]):
+                if stop is not None:
+                    stop = (para_start + stop[0], para_start + stop[1])
+                self.sentences.append((para_start + start, para_start + end, stop, index))
+
+        self._clauses = None
+        self._words = None
+        self._sentence_words = None
+
+
+    def _split_sentences(self, split):
+        """Split each sentence and offset the spans to the source."""
+        result = []
+        starts = []
+        for index, (sen_start, sen_end, _, _) in enumerate(self.sentences):
+            starts.append(len(result))
+            for start, end in split(self.text[sen_start:sen_end]):
+                result.append((sen_start + start, sen_start + end, index))
+        starts.append(len(result))
+        return result, starts
+
+
+    @property
+    def clauses(self):
+        """Spans of the clauses with the index of their sentence."""
+        if self._clauses is None:
+            def split(text):
+                for clause in self.segmenter.clause_spans(text):
+                    yield clause[0][0], clause[-1][1]
+
+            self._clauses = self._split_sentences(split)[0]
+        return self._clauses
+
+
+    @property
+    def words(self):
+        """Spans of the words with the index of their sentence."""
+        if self._words is None:
+            self._words, self._sentence_words = self._split_sentences(
+                lambda text: self.segmenter.word_spans(text, self.filter_numbers))
+        return self._words
+
+
+    def iter_paragraph(self, lazy=False):
+        """Yield the paragraphs and their separators as from Segmenter.iter_paragraph."""
+        yield from self.segmenter._view_pairs(self.source, self.paragraphs, lazy)
+
+
+    def iter_sentence(self, paragraph=None, lazy=False):
+        """Yield the sentences and their stops as from Segmenter.iter_sentence.
+        paragraph -- index of the paragraph or None for all.
+        """
+        spans = [sentence[:3] for sentence in self.sentences
+                 if paragraph is None or sentence[3] == paragraph]
+        yield from self.segmenter._view_pairs(self.source, spans, lazy)
+
+
+    def iter_clause(self, sentence=None, lazy=False):
+        """Yield the clauses.
+        sentence -- index of the sentence or None for all.
+        """
+        spans = [clause[:2] for clause in self.clauses
+                 if sentence is None or clause[2] == sentence]
+        yield from self.segmenter._view(self.source, spans, lazy)
+
+
+    def iter_word(self, sentence=None, lazy=False):
+        """Yield the words as from Segmenter.iter_word on the sentences.
+        sentence -- index of the sentence or None for all.
+        """
+        words = self.words
+        if sentence is not None:
+            words = words[self._sentence_words[sentence]:self._sentence_words[sentence + 1]]
+        yield from self.segmenter._view(self.source, [word[:2] for word in words], lazy)
@@ -0,0 +1,87 @@
+"""
+util.stemmer
+~~~~~~~~~~~~
+
+Cached stemming shared between the tools.
+"""
+
+import csv
+import hashlib
+
+import monostyle.util.monostyle_io as monostyle_io
+import monostyle.util.porter_stemmer as porter_stemmer_mod
+from monostyle.util.porter_stemmer import Porterstemmer
+
+
+def stemmer_version():
+    """Return a hash of the stemmer module which determines the stored stems."""
+    if stemmer_version.value is None:
+        hasher = hashlib.sha1()
+        try:
+            with open(porter_stemmer_mod.__file__, "rb") as module_file:
+                hasher.update(module_file.read())
+        except (IOError, OSError):
+            hasher.update(porter_stemmer_mod.__name__.encode("utf-8"))
+
+        stemmer_version.value = hasher.hexdigest()[:16]
+    return stemmer_version.value
+
+stemmer_version.value = None
+
+
+class Stemmer:
+    """Porter stemming with a bounded LRU cache and the stems stored with the lexicon."""
+
+    cache_size = 8192
+
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.porter_stemmer = Porterstemmer()
+            cls.stored = cls.read_csv()
+            # insertion order is the recency
+            cls.cache = {}
+            cls.instance = super().__new__(cls)
+        return cls.instance
+
+
+    @staticmethod
+    def read_csv():
+        """Read the stems from the user config directory.
+        The file is ignored if it was written by another version of the stemmer.
+        """
+        stems_filename = monostyle_io.path_to_abs("monostyle/stems.csv")
+        try:
+            with open(stems_filename, newline='', encoding='utf-8') as csvfile:
+                csv_reader = csv.reader(csvfile)
+                if next(csv_reader, None) != [stemmer_version()]:
+                    return {}
+                return {row[0]: row[1] for row in csv_reader if len(row) == 2}
+
+        except (IOError, OSError):
+            return {}
+
+
+    def stem(self, word_str):
+        """Return the stem of the word string."""
+        if (stem := self.stored.get(word_str)) is not None:
+            return stem
+
+        cache = self.cache
+        if (stem := cache.pop(word_str, None)) is None:
+            stem = self.porter_stemmer.stem(word_str, 0, len(word_str) - 1)
+            if len(cache) >= self.cache_size:
+                del cache[next(iter(cache))]
+        cache[word_str] = stem
+        return stem
+
+
+    def stem_many(self, words):
+        """Return the stems of the word strings."""
+        stems = {}
+        result = []
+        for word_str in words:
+            if (stem := stems.get(word_str)) is None:
+                stem = self.stem(word_str)
+                stems[word_str] = stem
+            result.append(stem)
+        return result
@@ -0,0 +1,89 @@
+"""
+util.token_table
+~~~~~~~~~~~~~~~~
+
+Segmentation of a text shared between the tools.
+"""
+
+import re
+from monostyle.util.segmenter import Segmenter
+from monostyle.util.stemmer import Stemmer
+
+
+class TokenTable:
+    """Sentences and words of a source segmented once."""
+
+    __slots__ = ('source', '_segmentation', '_sentences', '_sentence_words', '_words')
+
+
+    def __init__(self, source):
+        """
+        source -- Fragment to segment.
+        """
+        self.source = source
+        self._segmentation = None
+        self._sentences = None
+        self._sentence_words = {}
+        self._words = {}
+
+
+    def sentences(self):
+        """Return the sentences as from Segmenter.iter_sentence."""
+        if self._sentences is None:
+            self._sentences = list(self.segmentation().iter_sentence())
+        return self._sentences
+
+
+    def segmentation(self):
+        """Return the boundary table of the sentences and their words."""
+        if self._segmentation is None:
+            self._segmentation = Segmenter().segment(self.source, paragraphs=False,
+                                                     filter_numbers=False)
+        return self._segmentation
+
+
+    def sentence_words(self, index, filter_numbers=True):
+        """Return the words of the sentence at the index as from Segmenter.iter_word."""
+        key = (index, filter_numbers)
+        if (words := self._sentence_words.get(key)) is None:
+            if filter_numbers:
+                words = self._filter_numbers(self.sentence_words(index, False))
+            else:
+                words = list(self.segmentation().iter_word(index))
+            self._sentence_words[key] = words
+        return words
+
+
+    def words(self, filter_numbers=True):
+        """Return the words of the whole source as from Segmenter.iter_word."""
+        if (words := self._words.get(filter_numbers)) is None:
+            if filter_numbers:
+                words = self._filter_numbers(self.words(False))
+            else:
+                words = list(Segmenter().iter_word(self.source, False))
+            self._words[filter_numbers] = words
+        return words
+
+
+    def _filter_numbers(self, words):
+        number_filter_re = Segmenter().number_filter_re
+        return [word for word in words if not re.match(number_filter_re, str(word))]
+
+
+    def stem(self, word_str):
+        """Return the stem of the word string."""
+        return Stemmer().stem(word_str)
+
+
+def get_token_table(memo, source):
+    """Return the token table of the source.
+    memo -- memo of the document to share the table through or None.
+    """
+    if memo is None:
+        return TokenTable(source)
+
+    key = ("token-table", id(source))
+    if (entry := memo.get(key)) is None or entry[0] is not source:
+        entry = (source, TokenTable(source))
+        memo[key] = entry
+    return entry[1]